@@ -0,0 +1,90 @@
+"""Benchmark chunked prediction
+
+Script that compares predicting the test set as a whole (as formerly in the prediction scripts:
+read all test features, predict, save all predictions at once) with `prediction.predict_to_csv()`,
+which processes the test set in chunks, measuring peak memory and time for several test-set sizes.
+Also checks that both submission files are identical, and that a test set without instances yields
+a submission file with only the header. Uses synthetic data, so the competition data are not
+necessary.
+"""
+
+
+import filecmp
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import sklearn.pipeline
+import sklearn.tree
+
+import prediction
+import preprocessing
+from benchmarks import synthetic
+
+
+MAX_CATEGORIES = 40  # keeps fitting fast (fitting is not measured)
+NUM_TEST_INSTANCES = [100000, 1000000]  # competition's test data has about 87000 instances
+NUM_TRAIN_INSTANCES = 50000
+
+
+# Former prediction in "predict_tree.py"
+def predict_whole(model, test_path, output_path):
+    X_test = pd.read_csv(test_path)
+    y_test_pred = model.predict(X=X_test)
+    y_test_pred = pd.DataFrame({'building_id': X_test['building_id'], 'damage_grade': y_test_pred})
+    y_test_pred.to_csv(output_path, index=False)
+
+
+# Regression check: a test set without instances (only header) yields only the header
+def check_empty_test_set(model, X_test, temp_dir):
+    test_path = temp_dir / 'test_values.csv'
+    X_test.iloc[:0].to_csv(test_path, index=False)
+    for chunk_size in [prediction.CHUNK_SIZE, None]:
+        prediction.predict_to_csv(model=model, test_path=test_path,
+                                  output_path=temp_dir / 'chunked.csv', chunk_size=chunk_size,
+                                  dtype=X_test.dtypes.to_dict())
+        assert (temp_dir / 'chunked.csv').read_text() == 'building_id,damage_grade\n'
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    func()
+    end_time = time.perf_counter()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_s': end_time - start_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    X, y = synthetic.create_dataset(num_instances=NUM_TRAIN_INSTANCES + max(NUM_TEST_INSTANCES))
+    X_train, y_train = X.iloc[:NUM_TRAIN_INSTANCES], y.iloc[:NUM_TRAIN_INSTANCES]
+    model = sklearn.pipeline.make_pipeline(
+        preprocessing.create_preprocessor(X=X_train, max_categories=MAX_CATEGORIES),
+        sklearn.tree.DecisionTreeClassifier(random_state=25))
+    model.fit(X_train, y_train['damage_grade'])
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = pathlib.Path(temp_dir)
+        check_empty_test_set(model=model, X_test=X_train, temp_dir=temp_dir)
+        for num_instances in NUM_TEST_INSTANCES:
+            test_path = temp_dir / 'test_values.csv'
+            X.iloc[NUM_TRAIN_INSTANCES:(NUM_TRAIN_INSTANCES + num_instances)].to_csv(
+                test_path, index=False)
+            scenarios = {
+                'whole test set': lambda: predict_whole(
+                    model=model, test_path=test_path, output_path=temp_dir / 'whole.csv'),
+                'chunked': lambda: prediction.predict_to_csv(
+                    model=model, test_path=test_path, output_path=temp_dir / 'chunked.csv',
+                    dtype=X_train.dtypes.to_dict())
+            }
+            for name, func in scenarios.items():
+                results.append({'num_instances': num_instances, 'scenario': name,
+                                **measure(func)})
+            is_identical = filecmp.cmp(temp_dir / 'whole.csv', temp_dir / 'chunked.csv',
+                                       shallow=False)
+            for result in results[-len(scenarios):]:
+                result['identical'] = is_identical
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,87 @@
+"""Benchmark preprocessing for the decision-tree baseline
+
+Script that compares the dense one-hot encoding formerly used in `predict_tree.py` (encoded
+features concatenated with the other features into one `numpy` array) with the sparse pipeline of
+`preprocessing.create_preprocessor()` for several caps on the number of categories, measuring
+matrix size, peak memory, and time for encoding plus fitting a decision tree. Uses synthetic data,
+so the competition data are not necessary.
+"""
+
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import sklearn.preprocessing
+import sklearn.tree
+
+import preprocessing
+from benchmarks import synthetic
+
+
+MAX_CATEGORIES = [40, 400, None]  # None means all categories (about 13000 features)
+MAX_DENSE_MB = 2000  # skip dense encoding if the matrix would be larger
+NUM_INSTANCES = 50000  # competition's training data has about 260000 instances
+
+
+# Former preprocessing of "predict_tree.py"
+def encode_dense(X_train, max_categories):
+    multi_category_features = preprocessing.get_categorical_features(X=X_train)
+    encoder = sklearn.preprocessing.OneHotEncoder(sparse_output=False,
+                                                  max_categories=max_categories,
+                                                  handle_unknown='infrequent_if_exist')
+    encoder.fit(X=X_train[multi_category_features])
+    return np.concatenate([
+        X_train.drop(columns=(multi_category_features + [preprocessing.ID_FEATURE])).values,
+        encoder.transform(X=X_train[multi_category_features])], axis=1)
+
+
+def encode_sparse(X_train, max_categories, geo_encoding):
+    return preprocessing.create_preprocessor(
+        X=X_train, max_categories=max_categories, geo_encoding=geo_encoding).fit_transform(X_train)
+
+
+def get_matrix_mb(X):
+    if scipy.sparse.issparse(X):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 2**20
+    return X.nbytes / 2**20
+
+
+def measure(encode, y_train):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    X = encode()
+    encode_time = time.perf_counter() - start_time
+    sklearn.tree.DecisionTreeClassifier(random_state=25).fit(X=X, y=y_train)
+    fit_time = time.perf_counter() - start_time - encode_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'num_features': X.shape[1], 'matrix_mb': get_matrix_mb(X), 'encode_s': encode_time,
+            'fit_s': fit_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    X_train, y_train = synthetic.create_dataset(num_instances=NUM_INSTANCES)
+    y_train = y_train['damage_grade']
+    results = []
+    for max_categories in MAX_CATEGORIES:
+        scenarios = {
+            'dense': lambda: encode_dense(X_train=X_train, max_categories=max_categories),
+            'sparse': lambda: encode_sparse(X_train=X_train, max_categories=max_categories,
+                                            geo_encoding='onehot'),
+            'sparse (ordinal geo)': lambda: encode_sparse(
+                X_train=X_train, max_categories=max_categories, geo_encoding='ordinal')
+        }
+        num_categories = sum(min(X_train[x].nunique(), max_categories or np.inf)
+                             for x in preprocessing.get_categorical_features(X=X_train))
+        dense_mb = NUM_INSTANCES * (len(X_train.columns) + num_categories) * 8 / 2**20
+        for name, encode in scenarios.items():
+            if name == 'dense' and dense_mb > MAX_DENSE_MB:
+                print(f'Skipping dense encoding with max_categories={max_categories} (would need '
+                      f'about {dense_mb:.0f} MB).')
+                continue
+            results.append({'max_categories': max_categories, 'scenario': name,
+                            **measure(encode=encode, y_train=y_train)})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
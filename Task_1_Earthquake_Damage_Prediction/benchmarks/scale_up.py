@@ -0,0 +1,83 @@
+"""Benchmark scale-up
+
+Script that measures the end-to-end runtime of our pipeline on synthetic datasets (with the same
+columns as the competition data) with 0.1x to 10x the size of the competition's training data (see
+`SCALE_FACTORS`): splitting the data (`split.py`), predicting (`predict_majority.py`,
+`predict_tree.py`), and scoring (`score.py`), each run as a separate process in a temporary
+directory. Appends the results to the benchmark history (see `benchmarks.history`) and compares them
+with the previous run, to detect regressions between commits.
+"""
+
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from benchmarks import history
+from benchmarks import synthetic
+
+
+BASE_NUM_INSTANCES = 260601  # size of the competition's training data
+SCALE_FACTORS = [0.1, 1, 10]  # larger factors need (a lot) more memory and time
+SCRIPTS = ['split.py', 'predict_majority.py', 'predict_tree.py', 'score.py']
+TASK_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def run_script(script: str, work_dir: pathlib.Path) -> float:
+    """Run script
+
+    Args:
+        script (str): The file name of the script (in the task folder).
+        work_dir (pathlib.Path): The working directory, containing the "data/" directory.
+
+    Returns:
+        float: The wall time of running the script, including interpreter startup and imports.
+    """
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, str(TASK_DIR / script)], cwd=work_dir, check=True,
+                   env={**os.environ, 'PYTHONPATH': str(TASK_DIR)}, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start_time
+
+
+def run_pipeline(scale_factor: float) -> List[Dict[str, float]]:
+    """Run pipeline
+
+    Args:
+        scale_factor (float): The size of the synthetic dataset, relative to the competition's
+            training data.
+
+    Returns:
+        List[Dict[str, float]]: For each stage of the pipeline, its name and wall time.
+    """
+    num_instances = round(BASE_NUM_INSTANCES * scale_factor)
+    X, y = synthetic.create_dataset(num_instances=num_instances)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = pathlib.Path(work_dir)
+        (work_dir / 'data').mkdir()
+        X.to_csv(work_dir / 'data' / 'train_values.csv', index=False)
+        y.to_csv(work_dir / 'data' / 'train_labels.csv', index=False)
+        for script in SCRIPTS:
+            results.append({'stage': script,
+                            'time_s': run_script(script=script, work_dir=work_dir)})
+    return [{'scale_factor': scale_factor, 'num_instances': num_instances, **x} for x in results]
+
+
+if __name__ == '__main__':
+    results = []
+    for scale_factor in SCALE_FACTORS:
+        results.extend(run_pipeline(scale_factor=scale_factor))
+    results = pd.DataFrame(results)
+    print(results.round(3).to_string(index=False), end='\n\n')
+    comparison = history.save_and_compare(results=results, benchmark='scale_up',
+                                          key_columns=['scale_factor', 'stage'])
+    print(comparison.round(3).to_string(index=False))
+    if comparison['regression'].any():
+        print(f'\nRegression: at least one stage took more than {history.REGRESSION_THRESHOLD}x the'
+              ' time of the previous run.')
@@ -0,0 +1,136 @@
+"""Benchmark submission validation
+
+Script that compares validating and scoring a submission as formerly in `score.py` (parse the whole
+file with `pandas`, validate the DataFrame, then match predictions to the ground truth) with
+`score.validate_submission()`, which streams the file in blocks and stops at the first problem,
+measuring time and peak memory for valid submissions and submissions with a problem early or late
+in the file. Also checks that both yield the same validity status and predictions, and that
+`score.validate_submission()` rejects rows with surplus fields at the boundaries of its blocks and
+that `scoring.read_submission()` matches digit-only string identifiers (like the hashes in Task 2a).
+Uses synthetic data, so the competition data are not necessary.
+"""
+
+
+import csv
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import score
+import scoring
+
+
+NUM_INSTANCES = [87000, 1000000]  # competition's test data has about 87000 instances
+PROBLEM_POSITIONS = {'valid': None, 'early problem': 0.01, 'late problem': 0.99}
+BOUNDARY_CASES = [(100000, 10000), (30001, 30000)]  # number of rows, row (0-based) to corrupt
+
+
+# Former validation and alignment in "score.py"
+def validate_whole(submission_file, ground_truth, sorted_ids):
+    submission = pd.read_csv(submission_file, sep=',', quoting=csv.QUOTE_NONE, header=0,
+                             escapechar=None, encoding='utf-8')
+    if submission.shape[0] != ground_truth.shape[0]:
+        return 'Number of predictions wrong (could also be issue with header).', None
+    if submission.shape[1] != ground_truth.shape[1]:
+        return 'Number of columns wrong (index column might be saved).', None
+    if list(submission) != list(ground_truth):
+        return 'At least one column name wrong (might be quoted).', None
+    if submission.isna().any().any():
+        return 'At least one NA.', None
+    if not submission['damage_grade'].isin([1, 2, 3]).all():
+        return 'At least one invalid class label.', None
+    ids = submission['building_id'].values
+    order = np.argsort(ids, kind='stable')
+    if not np.array_equal(ids[order], sorted_ids):  # not exactly one prediction per instance
+        return 'Valid.', None
+    return 'Valid.', submission['damage_grade'].values[order]
+
+
+# Regression check: surplus fields must be detected wherever the row is in a block (e.g., first)
+def check_block_boundaries(submission_path):
+    cases = [(num_instances, bad_row, None) for num_instances, bad_row in BOUNDARY_CASES]
+    # Small blocks, so the corrupted row is at each position relative to block boundaries once:
+    cases.extend((100, 50, chunk_bytes) for chunk_bytes in range(1, 100))
+    for num_instances, bad_row, chunk_bytes in cases:
+        ids = np.arange(num_instances)
+        lines = [f'{building_id},{building_id % 3 + 1}' for building_id in ids]
+        for bad_fields in [',1', ',']:  # extra field, trailing empty field
+            bad_lines = lines.copy()
+            bad_lines[bad_row] += bad_fields
+            submission_path.write_text('building_id,damage_grade\n' + '\n'.join(bad_lines) + '\n')
+            if chunk_bytes is None:
+                validity_status, _ = score.validate_submission(
+                    submission_file=submission_path, ground_truth_ids=pd.Index(ids))
+            else:
+                validity_status, _ = scoring.read_submission(
+                    submission_file=submission_path, sorted_ids=pd.Index(ids),
+                    columns=['building_id', 'damage_grade'], check_labels=score.check_labels,
+                    chunk_bytes=chunk_bytes)
+            assert validity_status == 'Number of columns wrong (index column might be saved).', \
+                f'Row {bad_row} of {num_instances} with "{bad_fields}": {validity_status}'
+
+
+# Regression check: string identifiers must not be read as numbers in blocks where all of them are
+# digit-only (e.g., small first blocks, or the last line if the file does not end with line break)
+def check_string_ids(submission_path):
+    ids = np.array([f'{x:032x}' for x in range(1, 1000)] + ['1234567890123456'], dtype=object)
+    sorted_ids, _ = scoring.index_ground_truth(ids=ids, labels=np.zeros(len(ids)))
+    for line_end in ['', '\n']:
+        submission_path.write_text('hash,result\n' + '\n'.join(f'{x},sat' for x in ids) + line_end)
+        for chunk_bytes in [1, 100, scoring.CHUNK_BYTES]:
+            validity_status, _ = scoring.read_submission(
+                submission_file=submission_path, sorted_ids=pd.Index(sorted_ids),
+                columns=['hash', 'result'], check_labels=lambda labels: None,
+                chunk_bytes=chunk_bytes)
+            assert validity_status == 'Valid.', \
+                f'Line end {line_end!r}, block size {chunk_bytes}: {validity_status}'
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func()
+    end_time = time.perf_counter()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'time_s': end_time - start_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(seed=25)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        submission_path = pathlib.Path(temp_dir) / 'team_prediction.csv'
+        check_block_boundaries(submission_path=submission_path)
+        check_string_ids(submission_path=submission_path)
+        for num_instances in NUM_INSTANCES:
+            ground_truth = pd.DataFrame({
+                'building_id': rng.permutation(10 * num_instances)[:num_instances],
+                'damage_grade': rng.integers(low=1, high=4, size=num_instances)})
+            sorted_ids, _ = scoring.index_ground_truth(
+                ids=ground_truth['building_id'].values, labels=ground_truth['damage_grade'].values)
+            ground_truth_ids = pd.Index(sorted_ids)
+            ground_truth_ids.get_indexer(sorted_ids[:1])  # builds hash table, once per worker
+            for case, problem_position in PROBLEM_POSITIONS.items():
+                submission = ground_truth.sample(frac=1, random_state=25)
+                submission['damage_grade'] = rng.integers(low=1, high=4, size=num_instances)
+                if problem_position is not None:
+                    submission.iloc[int(problem_position * num_instances), 1] = 4  # invalid label
+                submission.to_csv(submission_path, index=False)
+                whole_result, whole_stats = measure(lambda: validate_whole(
+                    submission_file=submission_path, ground_truth=ground_truth,
+                    sorted_ids=sorted_ids))
+                stream_result, stream_stats = measure(lambda: score.validate_submission(
+                    submission_file=submission_path, ground_truth_ids=ground_truth_ids))
+                same_status = whole_result[0] == stream_result[0]
+                same_predictions = ((whole_result[1] is None and stream_result[1] is None) or
+                                    np.array_equal(whole_result[1], stream_result[1]))
+                for method, stats in [('whole', whole_stats), ('streamed', stream_stats)]:
+                    results.append({'num_instances': num_instances, 'case': case,
+                                    'method': method, **stats,
+                                    'same_result': same_status and same_predictions})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
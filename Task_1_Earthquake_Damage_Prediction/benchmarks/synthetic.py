@@ -0,0 +1,64 @@
+"""Synthetic earthquake data
+
+Helper module for the benchmarks. Creates random datasets with the same columns (and roughly the
+same number of categories per column) as the competition data, so benchmarks do not depend on the
+real data.
+"""
+
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+CATEGORICAL_FEATURES = {  # name: number of categories
+    'land_surface_condition': 3, 'foundation_type': 5, 'roof_type': 3, 'ground_floor_type': 5,
+    'other_floor_type': 4, 'position': 4, 'plan_configuration': 10, 'legal_ownership_status': 4
+}
+GEO_LEVEL_CATEGORIES = (31, 1414, 11595)
+NUMERICAL_FEATURES = {  # name: maximum value
+    'count_floors_pre_eq': 9, 'age': 995, 'area_percentage': 100, 'height_percentage': 32
+}
+SECONDARY_USE_FEATURES = [
+    'has_secondary_use', 'has_secondary_use_agriculture', 'has_secondary_use_hotel',
+    'has_secondary_use_rental', 'has_secondary_use_institution', 'has_secondary_use_school',
+    'has_secondary_use_industry', 'has_secondary_use_health_post', 'has_secondary_use_gov_office',
+    'has_secondary_use_use_police', 'has_secondary_use_other'
+]
+SUPERSTRUCTURE_FEATURES = [
+    'has_superstructure_adobe_mud', 'has_superstructure_mud_mortar_stone',
+    'has_superstructure_stone_flag', 'has_superstructure_cement_mortar_stone',
+    'has_superstructure_mud_mortar_brick', 'has_superstructure_cement_mortar_brick',
+    'has_superstructure_timber', 'has_superstructure_bamboo',
+    'has_superstructure_rc_non_engineered', 'has_superstructure_rc_engineered',
+    'has_superstructure_other'
+]
+
+
+def create_dataset(num_instances: int, seed: int = 25) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed=seed)
+    values = {'building_id': rng.permutation(10 * num_instances)[:num_instances]}
+    # Geo levels are hierarchical, i.e., each ID of a lower level belongs to one higher-level ID:
+    geo_ids = rng.integers(low=0, high=GEO_LEVEL_CATEGORIES[-1], size=num_instances)
+    for level, num_categories in enumerate(GEO_LEVEL_CATEGORIES, start=1):
+        values[f'geo_level_{level}_id'] = geo_ids * num_categories // GEO_LEVEL_CATEGORIES[-1]
+    for feature, max_value in NUMERICAL_FEATURES.items():
+        values[feature] = np.minimum(rng.geometric(p=0.3, size=num_instances), max_value)
+    for feature, num_categories in CATEGORICAL_FEATURES.items():
+        categories = np.array([chr(ord('a') + i) for i in range(num_categories)], dtype=object)
+        values[feature] = categories[rng.zipf(a=2, size=num_instances) % num_categories]
+    for feature in SUPERSTRUCTURE_FEATURES:
+        values[feature] = (rng.random(size=num_instances) < 0.2).astype(int)
+    values['count_families'] = np.minimum(rng.poisson(lam=1, size=num_instances), 9)
+    for feature in SECONDARY_USE_FEATURES:
+        values[feature] = (rng.random(size=num_instances) < 0.05).astype(int)
+    X = pd.DataFrame(values)
+    columns = list(X.columns)  # move column to same position as in competition data
+    columns.remove('legal_ownership_status')
+    columns.insert(columns.index('count_families'), 'legal_ownership_status')
+    X = X[columns]
+    y = pd.DataFrame({'building_id': X['building_id'],
+                      'damage_grade': rng.choice([1, 2, 3], p=[0.1, 0.57, 0.33],
+                                                 size=num_instances)})
+    return X, y
@@ -0,0 +1,121 @@
+"""Cache for fitted models
+
+Helper module for storing fitted models (or whole pipelines, e.g., encoder plus classifier) on
+disk and re-using them in later runs, so predicting another test set does not require refitting.
+Models are keyed by a hash of the training data and the model's hyperparameters (which include the
+random seed). See function `fit_or_load()` for more information.
+
+The cache is a directory with one `joblib` file per fitted model. Its size is bounded; if it grows
+too large, the least recently used models are evicted.
+"""
+
+
+import os
+import pathlib
+import tempfile
+from typing import Any, Optional
+
+import joblib
+import pandas as pd
+
+
+DEFAULT_CACHE_DIR = pathlib.Path('data/model_cache/')
+DEFAULT_MAX_SIZE_MB = 1000
+FILE_SUFFIX = '.joblib'
+
+
+# Pickle-based hashing of object columns is slow, so hash pandas data row-wise (vectorized)
+def _get_data_fingerprint(data: Any) -> Any:
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        columns = list(data.columns) if isinstance(data, pd.DataFrame) else data.name
+        return {'type': type(data).__name__, 'columns': columns,
+                'dtypes': [str(x) for x in pd.DataFrame(data).dtypes],
+                'rows': pd.util.hash_pandas_object(data, index=True).to_numpy()}
+    return data
+
+
+def get_cache_key(model: Any, X: Any, y: Any) -> str:
+    """Get cache key
+
+    Args:
+        model (Any): An (unfitted) `sklearn`-compatible model.
+        X (Any): The training features (e.g., a `pd.DataFrame`).
+        y (Any): The training labels (e.g., a `pd.Series`).
+
+    Returns:
+        str: A hash of the model's class and hyperparameters (including nested models, e.g., for
+            pipelines) as well as of the training data.
+    """
+    return joblib.hash({'model_class': f'{type(model).__module__}.{type(model).__qualname__}',
+                        'params': model.get_params(deep=True), 'X': _get_data_fingerprint(X),
+                        'y': _get_data_fingerprint(y)})
+
+
+def evict(cache_dir: pathlib.Path, max_size_mb: float, keep: Optional[pathlib.Path] = None) -> None:
+    """Evict least recently used models
+
+    Delete cached models, starting with the least recently used one, until the total size of the
+    cache is at most `max_size_mb`.
+
+    Args:
+        cache_dir (pathlib.Path): The cache directory.
+        max_size_mb (float): The maximum total size of all cached models (in MB).
+        keep (Optional[pathlib.Path], optional): A cached model which should never be deleted
+            (e.g., because it was just stored). Defaults to None.
+
+    Returns:
+        None.
+    """
+    model_files = []
+    for model_path in pathlib.Path(cache_dir).glob(f'*{FILE_SUFFIX}'):
+        try:
+            stat = model_path.stat()
+        except FileNotFoundError:  # deleted by a concurrent run
+            continue
+        model_files.append((stat.st_mtime, stat.st_size, model_path))
+    total_size = sum(x[1] for x in model_files)
+    for _, size, model_path in sorted(model_files, key=lambda x: x[0]):  # oldest first
+        if total_size <= max_size_mb * 2**20:
+            break
+        if model_path != keep:
+            model_path.unlink(missing_ok=True)
+            total_size -= size
+
+
+def fit_or_load(model: Any, X: Any, y: Any, cache_dir: pathlib.Path = DEFAULT_CACHE_DIR,
+                max_size_mb: float = DEFAULT_MAX_SIZE_MB) -> Any:
+    """Fit model or load it from cache
+
+    If a model with the same hyperparameters was already fitted on the same training data, load it
+    from the cache (memory-mapping its arrays where possible) instead of fitting it again.
+    Otherwise, fit the model, store it in the cache, and evict the least recently used models if
+    the cache has become too large.
+
+    Args:
+        model (Any): An (unfitted) `sklearn`-compatible model.
+        X (Any): The training features (e.g., a `pd.DataFrame`).
+        y (Any): The training labels (e.g., a `pd.Series`).
+        cache_dir (pathlib.Path, optional): The cache directory (will be created if not existing).
+            Defaults to DEFAULT_CACHE_DIR.
+        max_size_mb (float, optional): The maximum total size of all cached models (in MB).
+            Defaults to DEFAULT_MAX_SIZE_MB.
+
+    Returns:
+        Any: The fitted model (if fitted, the passed `model` object; if loaded, a new object).
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    model_path = cache_dir / f'{get_cache_key(model=model, X=X, y=y)}{FILE_SUFFIX}'
+    try:
+        cached_model = joblib.load(model_path, mmap_mode='r')
+        os.utime(model_path)  # modification time marks last use (access time is not reliable)
+        return cached_model
+    except FileNotFoundError:  # not cached (or just evicted by a concurrent run)
+        pass
+    model.fit(X, y)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False) as temp_file:
+        temp_path = pathlib.Path(temp_file.name)
+    joblib.dump(model, temp_path)
+    os.replace(temp_path, model_path)  # atomic, so other runs never load incomplete files
+    evict(cache_dir=cache_dir, max_size_mb=max_size_mb, keep=model_path)
+    return model
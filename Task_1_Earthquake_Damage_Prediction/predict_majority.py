@@ -9,17 +9,21 @@ import pathlib
 import pandas as pd
 import sklearn.dummy
 
+import model_cache
+import prediction
 
+
+CHUNK_SIZE = 100000  # number of test instances predicted at once; None = all
 DATA_DIR = pathlib.Path('data/scoring/')
 
 
 if __name__ == '__main__':
-    X_test = pd.read_csv(DATA_DIR / 'test_values.csv')
     y_train = pd.read_csv(DATA_DIR / 'train_labels.csv')
 
     model = sklearn.dummy.DummyClassifier(strategy='most_frequent')
-    model.fit(X=None, y=y_train['damage_grade'])
-    y_test_pred = model.predict(X=X_test)
-    y_test_pred = pd.DataFrame({'building_id': X_test['building_id'], 'damage_grade': y_test_pred})
+    model = model_cache.fit_or_load(model=model, X=None, y=y_train['damage_grade'])
 
-    y_test_pred.to_csv(DATA_DIR / 'majority_prediction.csv', index=False)
+    # Predict test set in chunks (bounded memory) and save:
+    prediction.predict_to_csv(model=model, test_path=DATA_DIR / 'test_values.csv',
+                              output_path=DATA_DIR / 'majority_prediction.csv',
+                              chunk_size=CHUNK_SIZE)
@@ -1,45 +1,43 @@
 """Predict with decision tree for earthquake data
 
-Script that train a simple decision tree for the earthquake data.
+Script that trains a simple decision tree for the earthquake data. Preprocessing one-hot encodes
+the categorical features (at most `MAX_CATEGORIES` per feature). Only if all categories are encoded,
+the result is a sparse matrix (the tree fits much faster on a dense matrix with few columns). The
+fitted pipeline is cached, and the test set is predicted in chunks.
 """
 
 
 import pathlib
 
-import numpy as np
 import pandas as pd
-import sklearn.preprocessing
+import sklearn.pipeline
 import sklearn.tree
 
+import model_cache
+import prediction
+import preprocessing
 
+
+CHUNK_SIZE = 100000  # number of test instances predicted at once; None = all
 DATA_DIR = pathlib.Path('data/scoring/')
+MAX_CATEGORIES = 40  # cap on encoding features per categorical feature; None = all (much slower)
 
 
 if __name__ == '__main__':
     # Load
     X_train = pd.read_csv(DATA_DIR / 'train_values.csv')
-    X_test = pd.read_csv(DATA_DIR / 'test_values.csv')
     y_train = pd.read_csv(DATA_DIR / 'train_labels.csv')
 
-    # Preprocess (one-hot encode categorical features with a cap on number of encoding features):
-    test_ids = X_test['building_id']
-    multi_category_features = [col for col in X_train.columns if X_train[col].dtype == 'object']
-    multi_category_features.extend([f'geo_level_{i}_id' for i in (1, 2, 3)])
-    encoder = sklearn.preprocessing.OneHotEncoder(sparse_output=False, max_categories=40,
-                                                  handle_unknown='infrequent_if_exist')
-    encoder.fit(X=X_train[multi_category_features])
-    X_train = np.concatenate([
-        X_train.drop(columns=(multi_category_features + ['building_id'])).values,
-        encoder.transform(X=X_train[multi_category_features])], axis=1)
-    X_test = np.concatenate([
-        X_test.drop(columns=(multi_category_features + ['building_id'])).values,
-        encoder.transform(X=X_test[multi_category_features])], axis=1)
-
-    # Predict
-    model = sklearn.tree.DecisionTreeClassifier(random_state=25)
-    model.fit(X=X_train, y=y_train['damage_grade'])
-    y_test_pred = model.predict(X=X_test)
-    y_test_pred = pd.DataFrame({'building_id': test_ids, 'damage_grade': y_test_pred})
-
-    # Save
-    y_test_pred.to_csv(DATA_DIR / 'tree_prediction.csv', index=False)
+    # Preprocess (one-hot encode categorical features with a cap on number of encoding features;
+    # sparse matrix only for all categories) and predict; re-use pipeline from cache if already
+    # fitted on the same training data:
+    preprocessor = preprocessing.create_preprocessor(X=X_train, max_categories=MAX_CATEGORIES,
+                                                     sparse=(MAX_CATEGORIES is None))
+    model = sklearn.pipeline.make_pipeline(
+        preprocessor, sklearn.tree.DecisionTreeClassifier(random_state=25))
+    model = model_cache.fit_or_load(model=model, X=X_train, y=y_train['damage_grade'])
+
+    # Predict test set in chunks (bounded memory; column types as in training data) and save:
+    prediction.predict_to_csv(model=model, test_path=DATA_DIR / 'test_values.csv',
+                              output_path=DATA_DIR / 'tree_prediction.csv',
+                              chunk_size=CHUNK_SIZE, dtype=X_train.dtypes.to_dict())
@@ -0,0 +1,66 @@
+"""Chunked prediction for earthquake data
+
+Helper module for predicting large test sets with a fitted model (or pipeline) without holding
+the test set or the predictions in memory as a whole. See function `predict_to_csv()` for more
+information.
+"""
+
+
+import os
+import pathlib
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+
+CHUNK_SIZE = 100000  # number of test instances read and predicted at once
+ID_COLUMN = 'building_id'
+TARGET_COLUMN = 'damage_grade'
+
+
+def predict_to_csv(model: Any, test_path: pathlib.Path, output_path: pathlib.Path,
+                   chunk_size: Optional[int] = CHUNK_SIZE,
+                   dtype: Optional[Dict[str, Any]] = None) -> None:
+    """Predict test set and write submission
+
+    Read the test set in blocks of rows, predict each block with the fitted `model`, and append
+    the predictions to the submission file, so peak memory depends on `chunk_size` rather than on
+    the size of the test set. The file is the same (byte by byte) as when predicting and saving
+    the whole test set at once. It is written to a temporary file first and only replaces
+    `output_path` when complete. A test set without instances yields a file with only the header.
+
+    Args:
+        model (Any): A fitted `sklearn`-compatible model (e.g., preprocessing plus classifier).
+        test_path (pathlib.Path): The CSV file with the test features (including the ID column).
+        output_path (pathlib.Path): The CSV file for the predictions (ID and target column).
+        chunk_size (Optional[int], optional): The number of rows per block. Defaults to
+            CHUNK_SIZE. None means the whole test set at once.
+        dtype (Optional[Dict[str, Any]], optional): The column types of the test features, e.g.,
+            the types of the training features, so they do not depend on the values in a block.
+            Defaults to None (inferred for each block).
+
+    Returns:
+        None.
+    """
+    output_path = pathlib.Path(output_path)
+    temp_path = output_path.with_name(output_path.name + '.tmp')
+    try:
+        if chunk_size is None:
+            chunks = [pd.read_csv(test_path, dtype=dtype)]
+        else:
+            chunks = pd.read_csv(test_path, dtype=dtype, chunksize=chunk_size)
+        is_first_chunk = True
+        for X_test in chunks:
+            if len(X_test) == 0:  # models cannot predict zero instances
+                continue
+            y_test_pred = pd.DataFrame({ID_COLUMN: X_test[ID_COLUMN],
+                                        TARGET_COLUMN: model.predict(X=X_test)})
+            y_test_pred.to_csv(temp_path, mode=('w' if is_first_chunk else 'a'),
+                               header=is_first_chunk, index=False)
+            is_first_chunk = False
+        if is_first_chunk:  # no test instances
+            pd.DataFrame(columns=[ID_COLUMN, TARGET_COLUMN]).to_csv(temp_path, index=False)
+        os.replace(temp_path, output_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
@@ -0,0 +1,68 @@
+"""Preprocessing for earthquake data
+
+Helper module. See function `create_preprocessor()` for more information.
+"""
+
+
+from typing import List, Optional
+
+import pandas as pd
+import sklearn.compose
+import sklearn.preprocessing
+
+
+GEO_LEVEL_FEATURES = [f'geo_level_{i}_id' for i in (1, 2, 3)]
+ID_FEATURE = 'building_id'
+
+
+def get_categorical_features(X: pd.DataFrame) -> List[str]:
+    """Get categorical features
+
+    Args:
+        X (pd.DataFrame): The feature part of the earthquake data.
+
+    Returns:
+        List[str]: The names of the features with more than two categories, i.e., the string
+            features plus the geo levels (whose integer values are IDs rather than quantities).
+    """
+    categorical_features = [col for col in X.columns if X[col].dtype == 'object']
+    categorical_features.extend(GEO_LEVEL_FEATURES)
+    return categorical_features
+
+
+def create_preprocessor(X: pd.DataFrame, max_categories: Optional[int] = None,
+                        geo_encoding: str = 'onehot',
+                        sparse: bool = True) -> sklearn.compose.ColumnTransformer:
+    """Create preprocessor
+
+    Create an (unfitted) transformer that drops the ID column, keeps the numerical and binary
+    features, and encodes the categorical features. By default, one-hot encode all categories and
+    return a sparse (CSR) matrix, which `sklearn` tree models (and many other models) can use
+    without densifying it. The output keeps the column order of `predict_tree.py`'s former dense
+    encoding (unencoded features first, followed by the one-hot-encoded ones).
+
+    Args:
+        X (pd.DataFrame): The feature part of the earthquake data (only used to determine the
+            feature types).
+        max_categories (Optional[int], optional): Maximum number of one-hot-encoded categories per
+            feature (the infrequent ones are combined). Defaults to None (no limit).
+        geo_encoding (str, optional): How to encode the high-cardinality geo levels. Either
+            "onehot" or "ordinal" (keep their integer IDs, which tree models can split on).
+            Defaults to "onehot".
+        sparse (bool, optional): Whether to return a sparse matrix. Defaults to True.
+
+    Returns:
+        sklearn.compose.ColumnTransformer: The preprocessor.
+    """
+    if geo_encoding not in ('onehot', 'ordinal'):
+        raise ValueError('"geo_encoding" needs to be "onehot" or "ordinal".')
+    onehot_features = get_categorical_features(X)
+    if geo_encoding == 'ordinal':
+        onehot_features = [x for x in onehot_features if x not in GEO_LEVEL_FEATURES]
+    passthrough_features = [x for x in X.columns if x not in onehot_features + [ID_FEATURE]]
+    encoder = sklearn.preprocessing.OneHotEncoder(
+        sparse_output=sparse, max_categories=max_categories, handle_unknown='infrequent_if_exist')
+    return sklearn.compose.ColumnTransformer(
+        transformers=[('passthrough', 'passthrough', passthrough_features),
+                      ('onehot', encoder, onehot_features)],
+        remainder='drop', sparse_threshold=(1 if sparse else 0))
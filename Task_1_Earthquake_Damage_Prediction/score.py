@@ -1,53 +1,109 @@
 """Course-internal scoring on earthquake data
 
 Script that finds all submission files in some directory, checks their validity, and scores them
-against the ground truth.
+against the ground truth. Submissions are processed in parallel; the ground truth is loaded and
+indexed only once. Each submission is validated while reading it, stopping at the first problem.
+Besides the score, reports bootstrap confidence intervals and pairwise significance between teams.
 """
 
 
-import csv
+import concurrent.futures
 import pathlib
+import sys
+from typing import Dict, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
-import sklearn.metrics
 
+import scoring
 
+
+CONFIDENCE_LEVEL = 0.95
 DATA_DIR = pathlib.Path('data/scoring/')  # needs to contain submissions and ground truth solution
-METRIC = sklearn.metrics.matthews_corrcoef  # competition uses "accuracy_score"
-
-
-def validate_submission(submission: pd.DataFrame, ground_truth: pd.DataFrame) -> str:
-    if submission.shape[0] != ground_truth.shape[0]:
-        return 'Number of predictions wrong (could also be issue with header).'
-    if submission.shape[1] != ground_truth.shape[1]:
-        return 'Number of columns wrong (index column might be saved).'
-    if list(submission) != list(ground_truth):
-        return 'At least one column name wrong (might be quoted).'
-    if submission.isna().any().any():
-        return 'At least one NA.'
-    if not submission['damage_grade'].isin([1, 2, 3]).all():
+N_BOOTSTRAP = 1000  # number of bootstrap samples for confidence intervals and significance
+N_JOBS = None  # number of worker processes; None means number of processors on the machine
+
+_ground_truth_ids = None  # set once per worker process (see initializer)
+_ground_truth_labels = None
+
+
+# Check the predicted labels of one block of a submission (see `scoring.read_submission()`)
+def check_labels(labels: pd.Series) -> Optional[str]:
+    if not labels.isin([1, 2, 3]).all():
         return 'At least one invalid class label.'
-    return 'Valid.'
+    return None
+
+
+def validate_submission(submission_file: pathlib.Path,
+                        ground_truth_ids: pd.Index) -> Tuple[str, Optional[np.ndarray]]:
+    return scoring.read_submission(submission_file=submission_file, sorted_ids=ground_truth_ids,
+                                   columns=['building_id', 'damage_grade'],
+                                   check_labels=check_labels)
+
+
+# Competition uses accuracy, we use MCC (computed from confusion counts, no join with ground truth)
+def score_submission(y_pred: np.ndarray, sorted_labels: np.ndarray) -> float:
+    return float(scoring.matthews_corrcoef(scoring.count_confusion(y_true=sorted_labels,
+                                                                   y_pred=y_pred)))
+
+
+def _init_worker(ground_truth: pd.DataFrame) -> None:
+    global _ground_truth_ids, _ground_truth_labels
+    sorted_ids, _ground_truth_labels = scoring.index_ground_truth(
+        ids=ground_truth['building_id'].values, labels=ground_truth['damage_grade'].values)
+    _ground_truth_ids = pd.Index(sorted_ids)
+
+
+# Return leaderboard entry and (for valid submissions) predictions in order of indexed ground truth
+def process_submission(submission_file: pathlib.Path
+                       ) -> Tuple[Dict[str, Union[str, float]], Optional[np.ndarray]]:
+    team_name = submission_file.stem.replace('_prediction', '')
+    validity_status, y_pred = validate_submission(submission_file=submission_file,
+                                                  ground_truth_ids=_ground_truth_ids)
+    if y_pred is None:
+        score = float('nan')
+    else:
+        score = score_submission(y_pred=y_pred, sorted_labels=_ground_truth_labels)
+    return {'Team': team_name, 'Score': score, 'Validity': validity_status}, y_pred
 
 
-def score_submission(submission: pd.DataFrame, ground_truth: pd.DataFrame) -> float:
-    submission = submission.merge(ground_truth, on='building_id')
-    return METRIC(y_true=submission['damage_grade_y'], y_pred=submission['damage_grade_x'])
+# Add confidence intervals to the leaderboard entries; return pairwise p-values
+def add_bootstrap_results(results: Sequence[Dict[str, Union[str, float]]],
+                          y_preds: Sequence[Optional[np.ndarray]],
+                          sorted_labels: np.ndarray) -> pd.DataFrame:
+    bootstrap_idx = [i for i, y_pred in enumerate(y_preds) if y_pred is not None]
+    for result in results:
+        result['CI Lower'] = result['CI Upper'] = float('nan')
+    if len(bootstrap_idx) == 0:
+        return pd.DataFrame()
+    bootstrap_scores = scoring.bootstrap_mcc(
+        y_true=sorted_labels, y_preds=np.stack([y_preds[i] for i in bootstrap_idx]),
+        n_bootstrap=N_BOOTSTRAP)
+    lower, upper = scoring.confidence_interval(bootstrap_scores=bootstrap_scores,
+                                               confidence_level=CONFIDENCE_LEVEL)
+    for i, result_idx in enumerate(bootstrap_idx):
+        results[result_idx]['CI Lower'] = lower[i]
+        results[result_idx]['CI Upper'] = upper[i]
+    return scoring.pairwise_significance(
+        bootstrap_scores=bootstrap_scores, names=[results[i]['Team'] for i in bootstrap_idx])
 
 
 if __name__ == '__main__':
-    results = []
     ground_truth = pd.read_csv(DATA_DIR / 'test_labels.csv')
     submission_files = list(DATA_DIR.glob('*_prediction.csv'))
-    for submission_file in submission_files:
-        submission = pd.read_csv(submission_file, sep=',', quoting=csv.QUOTE_NONE, header=0,
-                                 escapechar=None, encoding='utf-8')
-        team_name = submission_file.stem.replace('_prediction', '')
-        validity_status = validate_submission(submission=submission, ground_truth=ground_truth)
-        if validity_status == 'Valid.':
-            score = score_submission(submission=submission, ground_truth=ground_truth)
-        else:
-            score = float('nan')
-        results.append({'Team': team_name, 'Score': score, 'Validity': validity_status})
-    results = pd.DataFrame(results).sort_values(by='Score', ascending=False)
-    print(results.round(2), end='\n\n')
+    if len(submission_files) == 0:
+        print('No submission files found.')
+        sys.exit()
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=N_JOBS, initializer=_init_worker, initargs=(ground_truth,)) as executor:
+        results, y_preds = zip(*executor.map(process_submission, submission_files))
+    _, sorted_labels = scoring.index_ground_truth(ids=ground_truth['building_id'].values,
+                                                  labels=ground_truth['damage_grade'].values)
+    p_values = add_bootstrap_results(results=results, y_preds=y_preds, sorted_labels=sorted_labels)
+    results = pd.DataFrame(results, columns=['Team', 'Score', 'CI Lower', 'CI Upper', 'Validity'])
+    results = results.sort_values(by='Score', ascending=False)
+    teams = [x for x in results['Team'] if x in p_values.index]  # same order as leaderboard
+    with pd.option_context('display.max_columns', None, 'display.width', None):
+        print(results.round(2), end='\n\n')
+        print('P-values (paired bootstrap; H0: row team is not better than column team):')
+        print(p_values.loc[teams, teams].round(3), end='\n\n')
@@ -0,0 +1,87 @@
+"""Incremental learning-curve evaluation for active learning
+
+Helper module. See class `LearningCurveEvaluator` for more information.
+"""
+
+
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+
+
+class LearningCurveEvaluator:
+    """Learning-curve evaluator
+
+    Class for training a prediction model on the labels revealed during active learning and
+    evaluating it in each iteration. Keeps the labeled data in pre-allocated arrays, so each
+    iteration only needs to add the newly queried instances. Models supporting `partial_fit()`
+    (e.g., `sklearn.linear_model.SGDClassifier`) are only updated with the new instances; other
+    models are refit on all labeled data (which re-uses the previous solution if the model has
+    `warm_start=True`, e.g., `sklearn.linear_model.LogisticRegression`). Scoring delegates to
+    `ALOracle.score_iteration()`, i.e., evaluates all three splits in one pass.
+    """
+
+    def __init__(self, model: Any, oracle: al_oracle.ALOracle, X_train: pd.DataFrame,
+                 X_test: pd.DataFrame, incremental: bool = True):
+        """Initializer
+
+        Args:
+            model (Any): A `sklearn`-compatible classifier.
+            oracle (al_oracle.ALOracle): The oracle, which was used to create the data split.
+            X_train (pd.DataFrame): The feature part of the training set (as returned by oracle).
+            X_test (pd.DataFrame): The feature part of the test set (as returned by oracle).
+                `None` if there is no test set.
+            incremental (bool, optional): Whether to use `partial_fit()` (if the model supports it)
+                rather than refitting on all labeled data. Defaults to True.
+
+        Returns:
+            None.
+        """
+        self.model = model
+        self.oracle = oracle
+        self.__X_train = X_train.to_numpy(dtype=float)
+        self.__X_test = None if X_test is None else X_test.to_numpy(dtype=float)
+        self.__use_partial_fit = incremental and hasattr(model, 'partial_fit')
+        self.__labeled_idx = np.empty(shape=len(X_train), dtype=int)
+        self.__y_labeled = np.empty(shape=len(X_train), dtype=int)
+        self.__num_labeled = 0
+
+    def update(self, query_indices: Iterable[int], labels: Iterable[float]) -> None:
+        """Add labeled instances and update model
+
+        Args:
+            query_indices (Iterable[int]): The indices of the newly labeled (training) instances.
+            labels (Iterable[float]): The labels of these instances (as used for training, i.e.,
+                without placeholders for missing labels).
+
+        Returns:
+            None.
+        """
+        query_indices = np.asarray(query_indices, dtype=int)
+        start, end = self.__num_labeled, self.__num_labeled + len(query_indices)
+        self.__labeled_idx[start:end] = query_indices
+        self.__y_labeled[start:end] = labels
+        self.__num_labeled = end
+        if self.__use_partial_fit:
+            self.model.partial_fit(self.__X_train[query_indices], self.__y_labeled[start:end],
+                                   classes=al_oracle.CLASSES)
+        else:
+            self.model.fit(self.__X_train[self.__labeled_idx[:end]], self.__y_labeled[:end])
+
+    def evaluate(self) -> Dict[str, float]:
+        """Evaluate model
+
+        Predict the training set and the test set once each and score the predictions on the
+        labeled part of the training set, the full training set, and the test set.
+
+        Returns:
+            Dict[str, float]: The MCC scores (see `ALOracle.score_iteration()`).
+        """
+        y_pred_test = None if self.__X_test is None else self.model.predict(self.__X_test)
+        return self.oracle.score_iteration(
+            y_pred_train=self.model.predict(self.__X_train), y_pred_test=y_pred_test,
+            labeled_indices=self.__labeled_idx[:self.__num_labeled],
+            y_labeled=self.__y_labeled[:self.__num_labeled])
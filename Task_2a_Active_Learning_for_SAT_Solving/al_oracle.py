@@ -1,14 +1,23 @@
 """Active-learning oracle for the SAT-solving task
 
-Helper module. See class `ALOracle` for more information.
+Helper module. See class `ALOracle` for more information. The class `Profiler` optionally records
+how much time (and memory) the phases of active-learning runs need, including the oracle's label
+queries and scoring.
 """
 
 
-from typing import Dict, Iterable, Optional, Tuple, Union
+import contextlib
+import functools
+import pathlib
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
-import sklearn.metrics
-import sklearn.model_selection
+
+import scoring
+import split
 
 
 DEFAULT_SOLVER = 'runtimes.Kissat_MAB_ESA'  # winner of 2022 SAT Competition's Anniversary Track
@@ -19,6 +28,142 @@ LABEL_NOTIMEOUT = 0
 LABEL_TIMEOUT = 1
 LABEL_SAT = 0
 LABEL_UNSAT = 1
+CLASSES = np.array([0, 1])  # encoded labels of all targets (binary classification)
+
+
+class Profiler:
+    """Profiler for active-learning runs
+
+    Class for recording wall time, number of calls, and (optionally) allocated memory of named
+    phases (e.g., query strategy, model update, label queries, scoring), separately for each
+    active-learning iteration. Phases are measured with the context manager `phase()` or functions
+    decorated with `profile()`. An `ALOracle` with a profiler records its label queries (phase
+    "query_labels") and scoring (phase "score") automatically.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """Initializer
+
+        Args:
+            trace_memory (bool, optional): Whether to record memory allocated in each phase (net
+                change of memory traced by `tracemalloc`), which slows down the run. Defaults to
+                False.
+
+        Returns:
+            None.
+        """
+        self.trace_memory = trace_memory
+        self.iteration = None  # set by user, e.g., at the start of each active-learning iteration
+        self.__records = {}  # (iteration, phase) -> [calls, time, memory]
+
+    def start_iteration(self, iteration: int) -> None:
+        """Start iteration
+
+        Args:
+            iteration (int): The active-learning iteration to which subsequent phases belong.
+
+        Returns:
+            None.
+        """
+        self.iteration = iteration
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure phase (context manager)
+
+        Args:
+            name (str): The name of the phase. Phases can be nested (and then are measured
+                separately, i.e., the time of the outer phase includes the inner one).
+
+        Returns:
+            Iterator[None]: Context for the code to be measured.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        start_memory = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            end_time = time.perf_counter()
+            end_memory = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+            record = self.__records.setdefault((self.iteration, name), [0, 0.0, 0])
+            record[0] += 1
+            record[1] += end_time - start_time
+            record[2] += end_memory - start_memory
+
+    def profile(self, name: str) -> Callable[[Callable], Callable]:
+        """Measure phase (decorator)
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            Callable[[Callable], Callable]: Decorator measuring each call of a function as phase.
+        """
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get_report(self) -> pd.DataFrame:
+        """Get report
+
+        Returns:
+            pd.DataFrame: One row per iteration and phase, with the number of calls, the total
+                wall time (in s), and the memory allocated (in MB; 0 if memory is not traced).
+        """
+        return pd.DataFrame(
+            [{'iteration': iteration, 'phase': phase, 'calls': calls, 'time_s': total_time,
+              'memory_mb': memory / 2**20}
+             for (iteration, phase), (calls, total_time, memory) in self.__records.items()],
+            columns=['iteration', 'phase', 'calls', 'time_s', 'memory_mb'])
+
+    def save_report(self, path: pathlib.Path) -> None:
+        """Save report
+
+        Args:
+            path (pathlib.Path): The output file. Format depends on suffix (".csv" or ".json").
+
+        Returns:
+            None.
+        """
+        save_report(report=self.get_report(), path=path)
+
+
+def save_report(report: pd.DataFrame, path: pathlib.Path) -> None:
+    """Save profiling report
+
+    Args:
+        report (pd.DataFrame): The report (see `Profiler.get_report()`), possibly of several runs.
+        path (pathlib.Path): The output file. Format depends on suffix (".csv" or ".json").
+
+    Returns:
+        None.
+    """
+    path = pathlib.Path(path)
+    if path.suffix == '.csv':
+        report.to_csv(path, index=False)
+    elif path.suffix == '.json':
+        report.to_json(path, orient='records', indent=1)
+    else:
+        raise ValueError('Report needs to be saved as ".csv" or ".json".')
+
+
+# Decorator for methods of ALOracle, measuring them as phase if the oracle has a profiler
+def _profiled(name: str) -> Callable[[Callable], Callable]:
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 class ALOracle:
@@ -28,16 +173,42 @@ class ALOracle:
     need to create an object of this class for all this functionality. After that, split the
     dataset first, since label queries and scoring depend on that particular data split
     (ground-truth labels and solver runtimes are stored within the object).
+
+    The oracle either handles one prediction target (see `split_data()`) or the timeouts of several
+    solvers at once (see `split_data_multi_solver()`). In the latter case, label queries and
+    scoring need to specify the target, i.e., solver.
+
+    Besides one holdout split, the oracle can create several holdout splits or (repeated)
+    cross-validation at once (see `create_splits()`), e.g., to assess the variance of learning
+    curves, and then switch between them (see `select_split()`).
     """
 
-    def __init__(self):
+    def __init__(self, profiler: Optional[Profiler] = None):
         """Default initializer
 
         Initialize private fields.
 
+        Args:
+            profiler (Optional[Profiler], optional): A profiler recording label queries and
+                scoring. Defaults to None (no profiling).
+
         Returns:
             None.
         """
+        self.profiler = profiler
+        # Data of all splits: a reference to the dataset (not a copy), the row positions of the
+        # instances usable for the target(s), and their labels and runtimes (stored once); each
+        # split only consists of positions (relative to the usable instances) as int32 arrays:
+        self.__dataset = None
+        self.__feature_positions = None
+        self.__instance_positions = None
+        self.__runtimes = None
+        self.__y = None
+        self.__split_indices = None
+        self.__split_id = None  # selected split, used for label queries and scoring
+        # All data of the selected split stored as (validated) 2-D numpy arrays with one column per
+        # target, to speed up queries and scoring (each column contiguous in memory):
+        self.__targets = None
         self.__runtimes_train = None  # needed to assess query costs during active learning
         self.__y_train = None
         self.__y_test = None
@@ -51,16 +222,15 @@ class ALOracle:
         particular solver times out as "y". Return the feature part and internally store the target
         part of the data plus the actual solver runtimes. For "result" as `target`, consider the
         runtimes of the `DEFAULT_SOLVER` and discard all instances where this solver times out
-        (since the solver cannot determine satisfiability for these instances).
+        (since the solver cannot determine satisfiability for these instances). Thin wrapper
+        around `create_splits()` and `select_split()`.
 
         Args:
             dataset (pd.DataFrame): The dataset containing instance features and solver runtimes.
             target (str): The prediction target. Needs to be either "result" or one of the
                 "runtimes." features.
             test_size (float): The fraction of instances going into the test set. Should be a
-                value in [0,1), i.e. having no test set is possible. Do not use 0.5 (or values very
-                close to it) since this messes up the scoring routine (which requires training set
-                and test set to have different sizes -- a slightly dubious design decision).
+                value in [0,1), i.e. having no test set is possible.
             random_state (int, optional): A seed to ensure reproducibility of the holdout split.
                 Defaults to 25.
 
@@ -68,36 +238,258 @@ class ALOracle:
             X_train (pd.DataFrame): The feature part of the training set.
             X_test (pd.DataFrame): The feature part of the test set. `None` if test_size == 0.
         """
+        self.create_splits(dataset=dataset, target=target, seeds=[random_state],
+                           test_size=test_size)
+        return self.select_split(split.get_split_id(seed=random_state))
+
+    def create_splits(self, dataset: pd.DataFrame, target: str, seeds: Sequence[int] = (25,),
+                      num_folds: Optional[int] = None, test_size: float = 0.2,
+                      split_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+                      ) -> List[str]:
+        """Create several splits
+
+        Like `split_data()`, but create one stratified holdout split per seed or (if `num_folds`
+        is passed) a stratified cross-validation per seed, i.e., repeated cross-validation for
+        several seeds. All splits are created at once. Labels and runtimes are stored only once,
+        the splits only as row positions, and the dataset is referenced rather than copied, so
+        many splits need little memory. Select a split with `select_split()` (which also returns
+        its features, copying the split's rows of the dataset) before querying labels or scoring.
+
+        Args:
+            dataset (pd.DataFrame): The dataset containing instance features and solver runtimes.
+            target (str): The prediction target (see `split_data()`).
+            seeds (Sequence[int], optional): Seeds to ensure reproducibility of the splits; one
+                holdout split or `num_folds` cross-validation splits per seed. Defaults to (25,).
+            num_folds (Optional[int], optional): The number of cross-validation folds. Defaults to
+                None (holdout splits with `test_size`).
+            test_size (float, optional): The fraction of instances going into the test set of
+                holdout splits (see `split_data()`). Defaults to 0.2.
+            split_indices (Optional[Dict[str, Dict[str, np.ndarray]]], optional): Splits created
+                before (see `get_split_indices()`) for the same dataset and target, e.g., shared
+                with worker processes, which are used instead of creating splits. Defaults to None.
+
+        Returns:
+            List[str]: The IDs of the splits (see `split.get_split_id()`), e.g., "seed25" for a
+                holdout split or "seed25_fold0" for the first cross-validation fold.
+        """
         if not isinstance(dataset, pd.DataFrame):
             raise ValueError('Method expects "dataset" to be a DataFrame, not a numpy array etc.')
         if target not in dataset.columns:
             raise ValueError('Desired "target" is not a column in the "dataset".')
-        if (test_size < 0) or (test_size >= 1):
-            raise ValueError('Size of the test set should be a relative value in [0,1).')
         if target == 'result':
-            dataset = dataset[dataset[DEFAULT_SOLVER] != 2 * COMPETITION_TIMEOUT]
-            runtimes = dataset[DEFAULT_SOLVER]
-            y = dataset[target].replace({'unsat': LABEL_UNSAT, 'sat': LABEL_SAT})
+            is_usable = (dataset[DEFAULT_SOLVER] != 2 * COMPETITION_TIMEOUT).to_numpy()
+            runtimes = dataset[DEFAULT_SOLVER][is_usable]
+            y = dataset[target][is_usable].replace({'unsat': LABEL_UNSAT, 'sat': LABEL_SAT})
         elif target.startswith('runtimes.'):
+            is_usable = np.ones(shape=len(dataset), dtype=bool)
             runtimes = dataset[target]
             y = (runtimes == 2 * COMPETITION_TIMEOUT).replace(
                 {False: LABEL_NOTIMEOUT, True: LABEL_TIMEOUT})
         else:
             raise ValueError('"target" needs to be the SAT result or the runtimes of a solver.')
         assert y.isin([0, 1]).all()  # all values properly encoded
-        X = dataset[[x for x in dataset.columns if x.startswith('base.') or x.startswith('gate.')]]
         runtimes = runtimes.replace(2 * COMPETITION_TIMEOUT, COMPETITION_TIMEOUT)  # revert PAR-2 scoring
-        if test_size == 0:
-            X_train, X_test, self.__y_train, self.__y_test, self.__runtimes_train = \
-                X, None, y, None, runtimes
-        else:
-            X_train, X_test, self.__y_train, self.__y_test, self.__runtimes_train, _ = \
-                sklearn.model_selection.train_test_split(
-                    X, y, runtimes, test_size=test_size, shuffle=True, stratify=y,
-                    random_state=random_state)
-            if len(X_train) == len(X_test):
-                raise ValueError('Split creating equally-sized training/test set not allowed.')
-        return (X_train, X_test)
+        return self.__store_splits(
+            dataset=dataset, targets=[target], instance_positions=np.flatnonzero(is_usable),
+            runtimes=runtimes.to_numpy(dtype=float).reshape(-1, 1),
+            y=y.to_numpy(dtype=int).reshape(-1, 1), stratify=y, seeds=seeds, num_folds=num_folds,
+            test_size=test_size, split_indices=split_indices)
+
+    def split_data_multi_solver(
+            self, dataset: pd.DataFrame, solvers: Optional[Sequence[str]] = None,
+            test_size: float = 0.2, random_state: int = 25,
+            stratify_solver: str = DEFAULT_SOLVER) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        """Create a holdout split for multiple solvers
+
+        Like `split_data()` with a "runtimes." feature as `target`, but create one split for the
+        timeout prediction of several solvers at once. Internally store the runtimes and labels of
+        all solvers as 2-D arrays, so label queries can mix solvers (see `query_labels_batch()`)
+        and the features only need to be split (and copied) once. The split is stratified
+        regarding the timeouts of one solver, i.e., it is the same as `split_data()` creates for
+        that solver.
+
+        Args:
+            dataset (pd.DataFrame): The dataset containing instance features and solver runtimes.
+            solvers (Optional[Sequence[str]], optional): The solvers, i.e., "runtimes." features.
+                Defaults to None (in which case all "runtimes." features are used).
+            test_size (float): The fraction of instances going into the test set. Should be a
+                value in [0,1), i.e. having no test set is possible.
+            random_state (int, optional): A seed to ensure reproducibility of the holdout split.
+                Defaults to 25.
+            stratify_solver (str, optional): The solver whose timeouts are used for stratification.
+                Defaults to DEFAULT_SOLVER.
+
+        Returns:
+            X_train (pd.DataFrame): The feature part of the training set.
+            X_test (pd.DataFrame): The feature part of the test set. `None` if test_size == 0.
+        """
+        if not isinstance(dataset, pd.DataFrame):
+            raise ValueError('Method expects "dataset" to be a DataFrame, not a numpy array etc.')
+        if solvers is None:
+            solvers = [x for x in dataset.columns if x.startswith('runtimes.')]
+        solvers = list(solvers)
+        if (len(solvers) == 0) or any(not x.startswith('runtimes.') for x in solvers):
+            raise ValueError('"solvers" need to be (at least one of) the "runtimes." features.')
+        if any(x not in dataset.columns for x in solvers + [stratify_solver]):
+            raise ValueError('Desired "solvers" are not columns in the "dataset".')
+        runtimes = dataset[solvers].to_numpy(dtype=float)
+        y = (runtimes == 2 * COMPETITION_TIMEOUT).astype(int)  # LABEL_TIMEOUT or LABEL_NOTIMEOUT
+        runtimes[y == LABEL_TIMEOUT] = COMPETITION_TIMEOUT  # revert PAR-2 scoring
+        self.__store_splits(
+            dataset=dataset, targets=solvers, instance_positions=np.arange(len(dataset)),
+            runtimes=runtimes, y=y, stratify=(dataset[stratify_solver] == 2 * COMPETITION_TIMEOUT),
+            seeds=[random_state], num_folds=None, test_size=test_size, split_indices=None)
+        return self.select_split(split.get_split_id(seed=random_state))
+
+    # Store data of all splits (see initializer); create the splits unless passed
+    def __store_splits(self, dataset: pd.DataFrame, targets: Sequence[str],
+                       instance_positions: np.ndarray, runtimes: np.ndarray, y: np.ndarray,
+                       stratify: pd.Series, seeds: Sequence[int], num_folds: Optional[int],
+                       test_size: float,
+                       split_indices: Optional[Dict[str, Dict[str, np.ndarray]]]) -> List[str]:
+        if split_indices is None:
+            if (num_folds is not None) and (num_folds < 2):
+                raise ValueError('Cross-validation needs at least two folds.')
+            if (num_folds is None) and ((test_size < 0) or (test_size >= 1)):
+                raise ValueError('Size of the test set should be a relative value in [0,1).')
+            if (num_folds is None) and (test_size == 0):
+                split_indices = {split.get_split_id(seed=seed): {
+                    'train': np.arange(len(y), dtype=np.int32),
+                    'test': np.empty(shape=0, dtype=np.int32)} for seed in seeds}
+            else:  # only based on labels, without slicing features
+                split_indices = split.create_split_indices(
+                    labels=stratify, seeds=seeds, num_folds=num_folds, test_size=test_size)
+        self.__dataset = dataset
+        self.__feature_positions = [i for i, x in enumerate(dataset.columns)
+                                    if x.startswith('base.') or x.startswith('gate.')]
+        self.__instance_positions = instance_positions
+        self.__targets = list(targets)
+        self.__runtimes = runtimes
+        self.__y = y
+        self.__split_indices = split_indices
+        self.__split_id = self.__runtimes_train = self.__y_train = self.__y_test = None
+        return list(split_indices.keys())
+
+    def select_split(self, split_id: str) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        """Select split
+
+        Use one of the splits created with `create_splits()` for label queries and scoring (label
+        queries refer to the instances of its training set).
+
+        Args:
+            split_id (str): The ID of the split (see `get_split_ids()`).
+
+        Returns:
+            X_train (pd.DataFrame): The feature part of the training set.
+            X_test (pd.DataFrame): The feature part of the test set. `None` if there is no test
+                set (i.e., test_size == 0).
+        """
+        indices = self.get_split_indices(split_id=split_id)
+        train_idx, test_idx = indices['train'], indices['test']
+        self.__split_id = split_id
+        self.__runtimes_train = np.asfortranarray(self.__runtimes[train_idx])
+        self.__y_train = np.asfortranarray(self.__y[train_idx])
+        self.__y_test = np.asfortranarray(self.__y[test_idx]) if len(test_idx) > 0 else None
+        X_train = self.__dataset.iloc[self.__instance_positions[train_idx],
+                                      self.__feature_positions]
+        if len(test_idx) == 0:
+            return (X_train, None)
+        return (X_train, self.__dataset.iloc[self.__instance_positions[test_idx],
+                                             self.__feature_positions])
+
+    def get_split_ids(self) -> List[str]:
+        """Get split IDs
+
+        Returns:
+            List[str]: The IDs of all splits created (see `create_splits()`).
+        """
+        if self.__split_indices is None:
+            raise ValueError('Data needs to be split before splits are known.')
+        return list(self.__split_indices.keys())
+
+    def get_selected_split_id(self) -> str:
+        """Get ID of selected split
+
+        Returns:
+            str: The ID of the split used for label queries and scoring (see `select_split()`).
+        """
+        if self.__split_id is None:
+            raise ValueError('A split needs to be selected first.')
+        return self.__split_id
+
+    def get_split_indices(self, split_id: Optional[str] = None
+                          ) -> Union[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]:
+        """Get split indices
+
+        Args:
+            split_id (Optional[str], optional): The ID of a split. Defaults to None (all splits).
+
+        Returns:
+            Union[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]: The positions of the
+                "train" and "test" instances (among the instances usable for the target) of the
+                split, or, if `split_id` is None, these positions for each split ID (which can be
+                passed to `create_splits()` of other oracles).
+        """
+        if self.__split_indices is None:
+            raise ValueError('Data needs to be split before splits are known.')
+        if split_id is None:
+            return self.__split_indices
+        if split_id not in self.__split_indices:
+            raise ValueError('Unknown split; see get_split_ids() for valid ones.')
+        return self.__split_indices[split_id]
+
+    def get_targets(self) -> List[str]:
+        """Get targets
+
+        Returns:
+            List[str]: The prediction target(s) of the current data split, i.e., one target if
+                created with `split_data()` and the solvers if created with
+                `split_data_multi_solver()`. Their positions can be used instead of their names
+                in label queries and scoring.
+        """
+        if self.__targets is None:
+            raise ValueError('Data needs to be split before targets are known.')
+        return list(self.__targets)
+
+    def get_target_positions(
+            self, targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+            ) -> np.ndarray:
+        """Get target positions
+
+        Args:
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The targets
+                (i.e., solvers), as names or positions (see `get_targets()`). Either a scalar or an
+                array. Defaults to None (only allowed if the oracle has one target).
+
+        Returns:
+            np.ndarray: The positions of the targets (with the same shape as `targets`).
+        """
+        if self.__targets is None:
+            raise ValueError('Data needs to be split before targets are known.')
+        if targets is None:
+            if len(self.__targets) != 1:
+                raise ValueError('Target needs to be specified if oracle has multiple targets.')
+            return np.array(0)
+        targets = np.asarray(targets)
+        if targets.dtype.kind in ('U', 'O'):
+            target_positions = {target: i for i, target in enumerate(self.__targets)}
+            if any(x not in target_positions for x in targets.ravel()):
+                raise ValueError('Unknown target(s); see get_targets() for valid ones.')
+            return np.vectorize(target_positions.get, otypes=[int])(targets)
+        if (targets.dtype.kind not in ('i', 'u')) or (targets.min(initial=0) < 0) or \
+                (targets.max(initial=0) >= len(self.__targets)):
+            raise ValueError('Target position(s) out of range; see get_targets() for valid ones.')
+        return targets
+
+    def get_train_size(self) -> int:
+        """Get size of training set
+
+        Returns:
+            int: The number of instances in the training set, i.e., the range of query indices.
+        """
+        if self.__y_train is None:
+            raise ValueError('Data needs to be split before the training set is known.')
+        return len(self.__y_train)
 
     def query_labels(
             self, query_indices: Iterable[int], query_timeouts: Optional[Iterable[float]] = None
@@ -107,7 +499,7 @@ class ALOracle:
         Return the labels of the queried instances subject to a timeout. I.e., if the passed timeout
         is lower than the actual solver runtime, the returned label is `NaN`. Else, the actual label
         is returned. The query cost amounts to the minimum of the actual solver runtime and the
-        passed timeout.
+        passed timeout. Thin wrapper around `query_labels_batch()`, returning one dict per query.
 
         Args:
             query_indices (Iterable[int]): The indices of the (training) instances for which labels
@@ -121,43 +513,172 @@ class ALOracle:
             Iterable[Dict[str, Union[float, int]]]: Label and query-cost information for the queried
                 indices.
         """
-        results = []
+        if (query_timeouts is not None) and (len(query_indices) != len(query_timeouts)):
+            raise ValueError('Length of query indices and of timeouts need to match.')
+        labels, costs, timed_out = self.query_labels_batch(query_indices=query_indices,
+                                                           query_timeouts=query_timeouts)
+        return [{'query_index': query_idx, 'label': LABEL_MISSING if is_timeout else int(label),
+                 'cost': cost}
+                for query_idx, label, cost, is_timeout in zip(
+                    query_indices, labels, costs.tolist(), timed_out)]
+
+    @_profiled('query_labels')
+    def query_labels_batch(
+            self, query_indices: Iterable[int],
+            query_timeouts: Optional[Union[float, Iterable[float]]] = None,
+            targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+            ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Query target labels (vectorized)
+
+        Same semantics as `query_labels()`, but processes all queries with array operations and
+        returns the results column-wise rather than as one dict per query. Thus, this method is
+        considerably faster for larger batches.
+
+        Args:
+            query_indices (Iterable[int]): The indices of the (training) instances for which labels
+                should be returned.
+            query_timeouts (Optional[Union[float, Iterable[float]]], optional): The timeouts for the
+                label queries. Either a scalar (used for all queries) or one value per query (needs
+                to have the same length as `query_indices`). Defaults to None (in which case each
+                solver is run till the timeout of the SAT Competition).
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The target
+                (i.e., solver), as name or position (see `get_targets()`), of the label queries.
+                Either a scalar (used for all queries) or one value per query. Defaults to None
+                (only allowed if the oracle has one target).
+
+        Returns:
+            labels (np.ndarray): The queried labels (float, `LABEL_MISSING` if timed out).
+            costs (np.ndarray): The query costs, i.e., minimum of actual runtime and timeout.
+            timed_out (np.ndarray): Boolean mask indicating which queries timed out.
+        """
+        if self.__runtimes_train is None:
+            raise ValueError('Data needs to be split before labels can be queried.')
+        query_indices = np.asarray(query_indices, dtype=int)
         if query_timeouts is None:
-            query_timeouts = [COMPETITION_TIMEOUT] * len(query_indices)
-        elif len(query_indices) != len(query_timeouts):
+            query_timeouts = COMPETITION_TIMEOUT
+        query_timeouts = np.asarray(query_timeouts, dtype=float)
+        if (query_timeouts.ndim > 0) and (query_timeouts.shape != query_indices.shape):
             raise ValueError('Length of query indices and of timeouts need to match.')
-        for query_idx, query_timeout in zip(query_indices, query_timeouts):
-            actual_runtime = self.__runtimes_train.iloc[query_idx]
-            if query_timeout < actual_runtime:
-                label = LABEL_MISSING
-                cost = query_timeout
-            else:
-                label = self.__y_train.iloc[query_idx]
-                cost = actual_runtime
-            results.append({'query_index': query_idx, 'label': label, 'cost': cost})
-        return results
-
-    def score(self, y_pred: Iterable[float]) -> float:
+        target_positions = self.get_target_positions(targets)
+        if (target_positions.ndim > 0) and (target_positions.shape != query_indices.shape):
+            raise ValueError('Length of query indices and of targets need to match.')
+        actual_runtimes = self.__runtimes_train[query_indices, target_positions]
+        timed_out = query_timeouts < actual_runtimes
+        labels = np.where(timed_out, LABEL_MISSING,
+                          self.__y_train[query_indices, target_positions])
+        costs = np.minimum(actual_runtimes, query_timeouts)
+        return labels, costs, timed_out
+
+    @_profiled('score')
+    def score(self, y_pred: Iterable[float], target: Optional[Union[int, str]] = None,
+              part: Optional[str] = None, split_id: Optional[str] = None) -> float:
         """Score predictions
 
         Compute the MCC score for the passed predictions.
 
         Args:
-            y_pred (Iterable[float]): The predictions. Needs to match either the length of the
-                training data or the test data (the corresponding ground truth will be chosen
-                accordingly). Needs to contain only proper binary-classification labels, no
-                placeholders for missing values (which might also be returned by the query method).
+            y_pred (Iterable[float]): The predictions, in the order of the training or test data.
+                Needs to contain only proper binary-classification labels, no placeholders for
+                missing values (which might also be returned by the query method).
+            target (Optional[Union[int, str]], optional): The target (i.e., solver), as name or
+                position (see `get_targets()`). Defaults to None (only allowed if the oracle has
+                one target).
+            part (Optional[str], optional): The ground truth, either "train" or "test". Defaults to
+                None (chosen by the length of `y_pred`, which requires training and test set to
+                have different sizes).
+            split_id (Optional[str], optional): The split of the ground truth (see
+                `get_split_ids()`). Defaults to None (split selected with `select_split()`).
 
         Returns:
             float: The MCC score.
         """
-        if len(y_pred) == len(self.__y_train):
-            y_true = self.__y_train
-        elif len(y_pred) == len(self.__y_test):
-            y_true = self.__y_test
+        if self.__y_train is None:
+            raise ValueError('Data needs to be split before predictions can be scored.')
+        target_position = int(self.get_target_positions(target))
+        if (split_id is None) or (split_id == self.__split_id):
+            y_train, y_test = self.__y_train, self.__y_test
+        else:  # gather ground truth from the labels of all instances
+            indices = self.get_split_indices(split_id=split_id)
+            y_train = self.__y[indices['train']]
+            y_test = self.__y[indices['test']] if len(indices['test']) > 0 else None
+        if part is None:
+            matches_train = len(y_pred) == len(y_train)
+            matches_test = (y_test is not None) and (len(y_pred) == len(y_test))
+            if matches_train and matches_test:
+                raise ValueError('Training and test data have the same size, so "part" needs to'
+                                 ' be specified.')
+            if not (matches_train or matches_test):
+                raise ValueError('Length of "y_pred" needs to correspond to training or test'
+                                 ' data.')
+            part = 'train' if matches_train else 'test'
+        if part == 'train':
+            y_true = y_train[:, target_position]
+        elif part == 'test':
+            if y_test is None:
+                raise ValueError('There is no test data.')
+            y_true = y_test[:, target_position]
         else:
-            raise ValueError('Length of "y_pred" needs to correspond to training or test data.')
-        y_pred = pd.Series(y_pred)
-        if not y_pred.isin([0, 1]).all():
-            raise ValueError('Invalid label(s) in "y_pred".')
-        return sklearn.metrics.matthews_corrcoef(y_true=y_true, y_pred=y_pred)
+            raise ValueError('"part" needs to be "train" or "test".')
+        y_pred = _validate_labels(y_pred)
+        if len(y_pred) != len(y_true):
+            raise ValueError(f'Length of "y_pred" needs to correspond to {part} data.')
+        return float(scoring.matthews_corrcoef(_count_confusion(y_true=y_true, y_pred=y_pred)))
+
+    @_profiled('score')
+    def score_iteration(self, y_pred_train: Iterable[float], y_pred_test: Optional[Iterable[float]],
+                        labeled_indices: Iterable[int], y_labeled: Iterable[float],
+                        target: Optional[Union[int, str]] = None) -> Dict[str, float]:
+        """Score predictions of one active-learning iteration
+
+        Compute the MCC scores on the labeled part of the training set, the full training set, and
+        the test set at once. Predictions for the labeled part are taken from the predictions for
+        the full training set, so the prediction model only needs to predict each split once.
+
+        Args:
+            y_pred_train (Iterable[float]): The predictions for the full training set.
+            y_pred_test (Optional[Iterable[float]]): The predictions for the test set. `None` if
+                there is no test set.
+            labeled_indices (Iterable[int]): The indices of the labeled (training) instances.
+            y_labeled (Iterable[float]): The labels used for training, i.e., as known to the active
+                learner (rather than the ground truth), in the order of `labeled_indices`.
+            target (Optional[Union[int, str]], optional): The target (i.e., solver), as name or
+                position (see `get_targets()`). Defaults to None (only allowed if the oracle has
+                one target).
+
+        Returns:
+            Dict[str, float]: The MCC scores, with the keys "labeled_train_score",
+                "full_train_score", and "test_score" (only if there is a test set).
+        """
+        if self.__y_train is None:
+            raise ValueError('Data needs to be split before predictions can be scored.')
+        target_position = int(self.get_target_positions(target))
+        y_pred_train = _validate_labels(y_pred_train, name='y_pred_train')
+        if len(y_pred_train) != len(self.__y_train):
+            raise ValueError('Length of "y_pred_train" needs to correspond to training data.')
+        labeled_indices = np.asarray(labeled_indices, dtype=int)
+        confusions = [
+            _count_confusion(y_true=_validate_labels(y_labeled, name='y_labeled'),
+                             y_pred=y_pred_train[labeled_indices]),
+            _count_confusion(y_true=self.__y_train[:, target_position], y_pred=y_pred_train)
+        ]
+        score_names = ['labeled_train_score', 'full_train_score']
+        if self.__y_test is not None:
+            y_pred_test = _validate_labels(y_pred_test, name='y_pred_test')
+            if len(y_pred_test) != len(self.__y_test):
+                raise ValueError('Length of "y_pred_test" needs to correspond to test data.')
+            confusions.append(_count_confusion(y_true=self.__y_test[:, target_position],
+                                               y_pred=y_pred_test))
+            score_names.append('test_score')
+        scores = scoring.matthews_corrcoef(np.stack(confusions))
+        return dict(zip(score_names, scores.tolist()))
+
+
+def _validate_labels(y: Iterable[float], name: str = 'y_pred') -> np.ndarray:
+    y = np.asarray(y)
+    if not ((y == 0) | (y == 1)).all():
+        raise ValueError(f'Invalid label(s) in "{name}".')
+    return y.astype(int)
+
+
+def _count_confusion(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return np.bincount(2 * y_true + y_pred, minlength=4).reshape(2, 2)
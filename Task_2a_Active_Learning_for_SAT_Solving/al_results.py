@@ -0,0 +1,190 @@
+"""Results store for active-learning experiments
+
+Helper module. See class `ResultsStore` for more information.
+"""
+
+
+import contextlib
+import hashlib
+import json
+import pathlib
+import sqlite3
+from typing import Any, Dict, Iterable, Optional, Sequence, Set
+
+import pandas as pd
+
+
+MAX_QUERY_PARAMETERS = 500  # SQLite limits the number of parameters per statement
+TIMEOUT_S = 60  # how long a connection waits for the lock held by another (concurrent) writer
+
+
+def get_config_hash(setting: Dict[str, Any]) -> str:
+    """Get configuration hash
+
+    Args:
+        setting (Dict[str, Any]): One experimental setting (see `al_runner.create_grid()`).
+
+    Returns:
+        str: A hash identifying the setting (independent from the order of its keys).
+    """
+    # JSON cannot encode numpy scalars (e.g., seeds from `np.arange()`):
+    setting = {key: _to_sql_value(value) for key, value in setting.items()}
+    return hashlib.sha256(json.dumps(setting, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# Quote column names for SQL statements
+def _quote(columns: Iterable[str], prefix: str = '') -> str:
+    return ', '.join(f'{prefix}"{column}"' for column in columns)
+
+
+# Placeholders for values in SQL statements
+def _placeholders(num_values: int) -> str:
+    return ', '.join('?' * num_values)
+
+
+# Convert numpy scalars (which sqlite3 cannot store) to Python scalars
+def _to_sql_value(value: Any) -> Any:
+    return value.item() if hasattr(value, 'item') else value
+
+
+# Create table if necessary and add missing columns (e.g., if settings of a new grid have more keys)
+def _create_table(connection: sqlite3.Connection, table: str, key_columns: Sequence[str],
+                  columns: Sequence[str]) -> None:
+    connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" '
+                       f'({_quote(list(key_columns) + list(columns))}, '
+                       f'PRIMARY KEY ({_quote(key_columns)}))')
+    existing_columns = [column for (_, column, *_) in connection.execute(
+        f'PRAGMA table_info("{table}")')]
+    for column in columns:
+        if column not in existing_columns:
+            connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+
+
+class ResultsStore:
+    """Results store
+
+    Class for storing the learning curves of active-learning experiments in an SQLite database, so
+    results survive crashes and finished experiments need not be re-run. The table "configs" has
+    one row per finished experimental setting (identified by a hash of the setting, see
+    `get_config_hash()`), with one column per parameter. The table "results" has one row per
+    setting and iteration, with one column per result (e.g., scores and costs), and is indexed by
+    setting hash and iteration, so loading the learning curves of some settings does not read the
+    whole database. Each experiment is saved in one transaction once finished, so the database
+    never contains incomplete experiments. Several processes can save experiments concurrently
+    (each with its own connection; SQLite serializes the writes).
+    """
+
+    def __init__(self, path: pathlib.Path):
+        """Initializer
+
+        Args:
+            path (pathlib.Path): The database file (will be created if not existing).
+
+        Returns:
+            None.
+        """
+        self.path = pathlib.Path(path)
+
+    def __connect(self) -> contextlib.closing:
+        connection = sqlite3.connect(self.path, timeout=TIMEOUT_S)
+        connection.execute('PRAGMA journal_mode=WAL')  # readers and writers do not block each other
+        return contextlib.closing(connection)
+
+    def get_finished_hashes(self) -> Set[str]:
+        """Get finished settings
+
+        Returns:
+            Set[str]: The hashes of all settings whose results are stored.
+        """
+        if not self.path.exists():
+            return set()
+        with self.__connect() as connection:
+            if connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND "
+                                  "name = 'configs'").fetchone() is None:
+                return set()
+            return {config_hash for (config_hash,) in connection.execute(
+                'SELECT config_hash FROM configs')}
+
+    def save(self, setting: Dict[str, Any], results: Sequence[Dict[str, Any]]) -> None:
+        """Save experiment
+
+        Save the results of one finished experiment, replacing previously stored results of the
+        same setting (if any).
+
+        Args:
+            setting (Dict[str, Any]): The experimental setting.
+            results (Sequence[Dict[str, Any]]): The results, one dict per iteration, each with the
+                key "iteration" (keys of `setting` are not stored again).
+
+        Returns:
+            None.
+        """
+        config_hash = get_config_hash(setting)
+        setting_columns = list(setting.keys())
+        result_columns = [] if len(results) == 0 else [
+            x for x in results[0].keys() if x not in setting_columns and x != 'iteration']
+        with self.__connect() as connection:
+            with connection:  # one transaction (locking the database for writing), committed at end
+                connection.execute('BEGIN IMMEDIATE')
+                _create_table(connection=connection, table='configs', key_columns=['config_hash'],
+                              columns=setting_columns)
+                _create_table(connection=connection, table='results',
+                              key_columns=['config_hash', 'iteration'], columns=result_columns)
+                connection.execute('DELETE FROM results WHERE config_hash = ?', (config_hash,))
+                columns = ['config_hash', 'iteration'] + result_columns
+                connection.executemany(
+                    f'INSERT INTO results ({_quote(columns)}) '
+                    f'VALUES ({_placeholders(len(columns))})',
+                    [[config_hash] + [_to_sql_value(result[x]) for x in columns[1:]]
+                     for result in results])
+                columns = ['config_hash'] + setting_columns
+                connection.execute(
+                    f'INSERT OR REPLACE INTO configs ({_quote(columns)}) '
+                    f'VALUES ({_placeholders(len(columns))})',
+                    [config_hash] + [_to_sql_value(setting[x]) for x in setting_columns])
+
+    def load_results(self, config_hashes: Optional[Iterable[str]] = None,
+                     **filters: Any) -> pd.DataFrame:
+        """Load learning curves
+
+        Args:
+            config_hashes (Optional[Iterable[str]], optional): The settings to load (in this order).
+                Defaults to None (all settings, in the order they were saved).
+            **filters (Any): Parameter values the settings need to have, e.g.,
+                `query_strategy='Random'`.
+
+        Returns:
+            pd.DataFrame: The column "config_hash", the parameters of the settings, and the
+                results, one row per setting and iteration.
+        """
+        with self.__connect() as connection:
+            setting_columns = [column for (_, column, *_) in connection.execute(
+                'PRAGMA table_info(configs)') if column != 'config_hash']
+            result_columns = [column for (_, column, *_) in connection.execute(
+                'PRAGMA table_info(results)') if column != 'config_hash']
+            columns = [_quote(['config_hash'] + setting_columns, prefix='c.'),
+                       _quote(result_columns, prefix='r.')]
+            query = (f'SELECT {", ".join(x for x in columns if x != "")} '
+                     'FROM configs c JOIN results r USING (config_hash)')
+            conditions = [f'c."{column}" = ?' for column in filters.keys()]
+            parameters = [_to_sql_value(value) for value in filters.values()]
+            if config_hashes is None:
+                if len(conditions) > 0:
+                    query += ' WHERE ' + ' AND '.join(conditions)
+                return pd.read_sql_query(query + ' ORDER BY c.rowid, r.iteration', connection,
+                                         params=parameters)
+            config_hashes = list(config_hashes)
+            chunks = []
+            # At least one query (if no hashes, "IN ()" matches nothing), for an empty result:
+            for start in range(0, max(len(config_hashes), 1), MAX_QUERY_PARAMETERS):
+                chunk_hashes = config_hashes[start:(start + MAX_QUERY_PARAMETERS)]
+                chunk_conditions = conditions + [
+                    f'c.config_hash IN ({_placeholders(len(chunk_hashes))})']
+                chunks.append(pd.read_sql_query(
+                    f'{query} WHERE {" AND ".join(chunk_conditions)}', connection,
+                    params=parameters + chunk_hashes))
+        results = pd.concat(chunks, ignore_index=True)
+        results['order'] = results['config_hash'].map(
+            {config_hash: i for i, config_hash in enumerate(config_hashes)})
+        return results.sort_values(['order', 'iteration']).drop(columns='order').reset_index(
+            drop=True)
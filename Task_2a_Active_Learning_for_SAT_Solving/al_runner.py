@@ -0,0 +1,259 @@
+"""Parallel experiment runner for timeout active learning
+
+Helper module. Runs the timeout active-learning loop from `Timeout_Active_Learning_Demo.ipynb`
+for a grid of experimental settings. See function `run_experiments()` for more information.
+"""
+
+
+import concurrent.futures
+import contextlib
+import functools
+import itertools
+import pathlib
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import skactiveml.utils
+import sklearn.tree
+
+import al_evaluation
+import al_oracle
+import al_results
+import al_strategies
+import dataset_cache
+import split
+
+
+QUERY_STRATEGIES = {  # create new objects for each experiment, so results do not depend on order
+    'Random': lambda seed: al_strategies.RandomStrategy(random_state=seed),
+    'Uncertainty-Entropy': lambda seed: al_strategies.UncertaintyStrategy(
+        method='entropy', random_state=seed)
+}
+TIMEOUT_LABEL = 1  # assumed label for timed-out queries (1 = timeout/unsat), as in demo notebook
+
+_worker_dataset = None  # each worker process loads the shared dataset once (see initializer)
+_worker_directory = None  # directory of the shared dataset and the split indices
+
+
+def create_grid(query_strategies: Iterable[str], query_timeouts: Iterable[float],
+                seeds: Iterable[int] = (25,), batch_sizes: Iterable[int] = (20,),
+                targets: Iterable[str] = (al_oracle.DEFAULT_SOLVER,),
+                num_folds: Optional[int] = None) -> Sequence[Dict[str, Any]]:
+    """Create grid of experimental settings
+
+    Build the cross-product of all passed parameter values. With `num_folds`, each setting also
+    has the keys "num_folds" and "fold", i.e., the grid contains one setting per fold of a
+    (repeated, if several `seeds`) cross-validation instead of one holdout split per seed.
+
+    Args:
+        query_strategies (Iterable[str]): Names of query strategies (keys of `QUERY_STRATEGIES`).
+        query_timeouts (Iterable[float]): Uniform query timeouts for the oracle.
+        seeds (Iterable[int], optional): Seeds for data split, query strategy, and model.
+            Defaults to (25,).
+        batch_sizes (Iterable[int], optional): Number of instances queried per iteration.
+            Defaults to (20,).
+        targets (Iterable[str], optional): Prediction targets (see `ALOracle.split_data()`).
+            Defaults to (al_oracle.DEFAULT_SOLVER,).
+        num_folds (Optional[int], optional): Number of cross-validation folds. Defaults to None
+            (holdout splits).
+
+    Returns:
+        Sequence[Dict[str, Any]]: The experimental settings, one dict each.
+    """
+    settings = [{'query_strategy': query_strategy, 'query_timeout': query_timeout, 'seed': seed,
+                 'batch_size': batch_size, 'target': target}
+                for query_strategy, query_timeout, seed, batch_size, target in itertools.product(
+                    query_strategies, query_timeouts, seeds, batch_sizes, targets)]
+    if num_folds is None:
+        return settings
+    return [{**setting, 'num_folds': num_folds, 'fold': fold}
+            for setting in settings for fold in range(num_folds)]
+
+
+# Directory for the split indices of holdout splits or of cross-validation with some folds
+def _get_split_dir(directory: pathlib.Path, num_folds: Optional[int]) -> pathlib.Path:
+    return directory / ('holdout' if num_folds is None else f'{num_folds}_folds')
+
+
+# Create all splits needed by the settings once, and save their indices (in the format of `split`)
+def _save_split_indices(dataset: pd.DataFrame, settings: Sequence[Dict[str, Any]],
+                        directory: pathlib.Path) -> None:
+    split_seeds = {}  # seeds per target and number of folds
+    for setting in settings:
+        split_seeds.setdefault((setting['target'], setting.get('num_folds')), set()).add(
+            setting['seed'])
+    oracle = al_oracle.ALOracle()
+    for (target, num_folds), seeds in split_seeds.items():
+        oracle.create_splits(dataset=dataset, target=target, seeds=sorted(seeds),
+                             num_folds=num_folds)
+        split_dir = _get_split_dir(directory=directory, num_folds=num_folds)
+        split_dir.mkdir(exist_ok=True)
+        for split_id, indices in oracle.get_split_indices().items():
+            np.savez(split.get_indices_path(target=target, split_id=split_id, data_dir=split_dir),
+                     **indices)
+
+
+def _init_worker(directory: pathlib.Path) -> None:
+    global _worker_dataset, _worker_directory
+    _worker_dataset = dataset_cache.load_cache(cache_dir=directory, mmap=True)
+    _worker_directory = directory
+
+
+def _release_worker() -> None:
+    global _worker_dataset, _worker_directory
+    _worker_dataset = None
+    _worker_directory = None
+
+
+# Replacement for Profiler.phase() if not profiling
+def _skip_phase(name: str) -> contextlib.AbstractContextManager:
+    return contextlib.nullcontext()
+
+
+def run_experiment(setting: Dict[str, Any],
+                   profiler: Optional[al_oracle.Profiler] = None) -> Sequence[Dict[str, Any]]:
+    """Run one active-learning experiment
+
+    Run the timeout active-learning loop for one experimental setting on the dataset loaded by the
+    current (worker) process, until the whole training set is labeled. The data split is loaded
+    from the split indices created by `run_experiments()` rather than created again.
+
+    Args:
+        setting (Dict[str, Any]): One experimental setting (see `create_grid()`).
+        profiler (Optional[al_oracle.Profiler], optional): A profiler recording the phases
+            "query_strategy", "query_labels", "model_update", "evaluation", and "score" (part of
+            "evaluation") in each iteration. Defaults to None (no profiling).
+
+    Returns:
+        Sequence[Dict[str, Any]]: The learning-curve results, one dict per iteration.
+    """
+    seed = setting['seed']
+    batch_size = setting['batch_size']
+    phase = _skip_phase if profiler is None else profiler.phase
+    oracle = al_oracle.ALOracle(profiler=profiler)
+    split_id = split.get_split_id(seed=seed, fold=setting.get('fold'))
+    split_dir = _get_split_dir(directory=_worker_directory, num_folds=setting.get('num_folds'))
+    oracle.create_splits(dataset=_worker_dataset, target=setting['target'], split_indices={
+        split_id: {part: split.load_indices(target=setting['target'], part=part,
+                                            split_id=split_id, data_dir=split_dir)
+                   for part in ('train', 'test')}})
+    X_train, X_test = oracle.select_split(split_id)
+    evaluator = al_evaluation.LearningCurveEvaluator(
+        model=sklearn.tree.DecisionTreeClassifier(random_state=seed), oracle=oracle,
+        X_train=X_train, X_test=X_test)
+    # The query strategy uses the evaluator's model, which is fitted once per iteration:
+    driver = al_strategies.ActiveLearningDriver(
+        X_train=X_train, strategy=QUERY_STRATEGIES[setting['query_strategy']](seed),
+        model=evaluator.model)
+    results = []
+    y_train_al = np.full(shape=len(X_train), fill_value=skactiveml.utils.MISSING_LABEL)
+    for i in range(int(len(X_train) / batch_size)):
+        if profiler is not None:
+            profiler.start_iteration(i)
+        with phase('query_strategy'):
+            query_idx = driver.query(batch_size=batch_size)
+        labels, costs, timed_out = oracle.query_labels_batch(
+            query_indices=query_idx, query_timeouts=setting['query_timeout'])
+        y_train_al[query_idx] = np.where(timed_out, TIMEOUT_LABEL, labels)
+        with phase('model_update'):
+            evaluator.update(query_indices=query_idx, labels=y_train_al[query_idx])
+            driver.update(query_indices=query_idx)
+        with phase('evaluation'):
+            scores = evaluator.evaluate()
+        results.append({**setting, 'iteration': i, **scores, 'batch_cost': costs.sum()})
+    return results
+
+
+# Run experiment with a new profiler; return its results and the profiling report
+def _run_profiled_experiment(setting: Dict[str, Any], trace_memory: bool
+                             ) -> Tuple[Sequence[Dict[str, Any]], pd.DataFrame]:
+    profiler = al_oracle.Profiler(trace_memory=trace_memory)
+    results = run_experiment(setting=setting, profiler=profiler)
+    report = profiler.get_report()
+    for i, (key, value) in enumerate(setting.items()):
+        report.insert(loc=i, column=key, value=value)
+    return results, report
+
+
+# Run experiment and save its results in the worker, so they are kept even if other experiments fail
+def _run_stored_experiment(setting: Dict[str, Any], experiment_func: Callable,
+                           results_path: pathlib.Path) -> Any:
+    output = experiment_func(setting)
+    results = output[0] if isinstance(output, tuple) else output  # profiling adds report
+    al_results.ResultsStore(path=results_path).save(setting=setting, results=results)
+    return output
+
+
+def run_experiments(dataset: pd.DataFrame, settings: Sequence[Dict[str, Any]],
+                    n_jobs: Optional[int] = None, profile_path: Optional[pathlib.Path] = None,
+                    trace_memory: bool = False,
+                    results_path: Optional[pathlib.Path] = None) -> pd.DataFrame:
+    """Run active-learning experiments in parallel
+
+    Run one experiment per setting, each in a worker process of a process pool. The dataset is
+    stored once in the binary format of `dataset_cache`, which all workers memory-map (rather than
+    each receiving a pickled copy of the whole dataset). All data splits (e.g., all folds of all
+    seeds) are created once before and stored as row positions, which the workers load. Each
+    experiment still copies the features of its split, i.e., its rows of the dataset (when
+    selecting the split and when the evaluator and the query-strategy driver convert them to
+    arrays). The results are identical to a serial run (`n_jobs=1`, which runs in the current
+    process).
+
+    Args:
+        dataset (pd.DataFrame): The dataset containing instance features and solver runtimes.
+        settings (Sequence[Dict[str, Any]]): The experimental settings (see `create_grid()`).
+        n_jobs (Optional[int], optional): Number of worker processes. Defaults to None (in which
+            case the number of processors on the machine is used).
+        profile_path (Optional[pathlib.Path], optional): If passed, profile each experiment (see
+            `run_experiment()`) and save the reports of all experiments to this file (".csv" or
+            ".json"), e.g., next to the learning-curve results. Defaults to None (no profiling).
+        trace_memory (bool, optional): Whether profiling should also record allocated memory (see
+            `al_oracle.Profiler`). Defaults to False.
+        results_path (Optional[pathlib.Path], optional): If passed, save the results of each
+            experiment as soon as it is finished to this database (see `al_results.ResultsStore`)
+            and skip settings whose results it already contains (e.g., from a crashed or previous
+            run; these are not profiled again). Defaults to None (only return results).
+
+    Returns:
+        pd.DataFrame: The learning-curve results of all experiments, ordered like `settings`,
+            with the cumulative query cost per experiment in column "total_cost".
+    """
+    if len(settings) == 0:  # e.g., empty grid
+        return pd.DataFrame(columns=['iteration', 'labeled_train_score', 'full_train_score',
+                                     'test_score', 'batch_cost', 'total_cost'])
+    if profile_path is None:
+        experiment_func = run_experiment
+    else:
+        experiment_func = functools.partial(_run_profiled_experiment, trace_memory=trace_memory)
+    pending_settings = settings
+    if results_path is not None:
+        finished_hashes = al_results.ResultsStore(path=results_path).get_finished_hashes()
+        pending_settings = [setting for setting in settings
+                            if al_results.get_config_hash(setting) not in finished_hashes]
+        experiment_func = functools.partial(_run_stored_experiment, experiment_func=experiment_func,
+                                            results_path=results_path)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = pathlib.Path(temp_dir)
+        dataset_cache.save_cache(dataset=dataset, cache_dir=temp_dir)
+        _save_split_indices(dataset=dataset, settings=pending_settings, directory=temp_dir)
+        if n_jobs == 1:
+            _init_worker(directory=temp_dir)
+            results = [experiment_func(setting) for setting in pending_settings]
+            _release_worker()  # memory-mapped file needs to be closed before deleting it
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_jobs, initializer=_init_worker, initargs=(temp_dir,)) as executor:
+                results = list(executor.map(experiment_func, pending_settings))
+    if (profile_path is not None) and (len(results) > 0):
+        results, reports = zip(*results)
+        al_oracle.save_report(report=pd.concat(reports, ignore_index=True), path=profile_path)
+    if results_path is None:
+        results = pd.DataFrame([result for experiment in results for result in experiment])
+    else:  # also contains results of settings finished in previous runs
+        results = al_results.ResultsStore(path=results_path).load_results(
+            config_hashes=[al_results.get_config_hash(setting) for setting in settings]
+        ).drop(columns='config_hash')
+    results['total_cost'] = results.groupby(list(settings[0].keys()))['batch_cost'].cumsum()
+    return results
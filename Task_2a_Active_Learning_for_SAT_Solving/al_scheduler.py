@@ -0,0 +1,389 @@
+"""Resumable timeout queries for active learning
+
+Helper module. See class `TimeoutScheduler` for more information. The classes `DoublingPolicy`
+and `RuntimePredictionPolicy` choose timeouts adaptively, i.e., per instance and query round.
+"""
+
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+import al_oracle
+
+
+class DoublingPolicy:
+    """Doubling timeout policy
+
+    Timeout policy that queries each instance with `initial_timeout` first and then multiplies the
+    time already spent on the instance by `factor` for each further query.
+    """
+
+    def __init__(self, initial_timeout: float = 100, factor: float = 2,
+                 max_timeout: float = al_oracle.COMPETITION_TIMEOUT):
+        """Initializer
+
+        Args:
+            initial_timeout (float, optional): The timeout of the first query. Defaults to 100.
+            factor (float, optional): The growth factor of timeouts. Defaults to 2.
+            max_timeout (float, optional): The maximum timeout. Defaults to the timeout of the SAT
+                Competition (for which labels are guaranteed to be returned).
+
+        Returns:
+            None.
+        """
+        self.initial_timeout = initial_timeout
+        self.factor = factor
+        self.max_timeout = max_timeout
+
+    def get_timeouts(self, query_indices: np.ndarray, target_positions: np.ndarray,
+                     elapsed: np.ndarray) -> np.ndarray:
+        """Get timeouts
+
+        Args:
+            query_indices (np.ndarray): The indices of the (training) instances to be queried.
+            target_positions (np.ndarray): The positions of the targets (i.e., solvers) to be
+                queried (same shape as `query_indices`).
+            elapsed (np.ndarray): The solver time already spent on each query.
+
+        Returns:
+            np.ndarray: The timeouts (total solver time, including `elapsed`) for the next query.
+        """
+        return np.minimum(np.maximum(self.initial_timeout, self.factor * elapsed),
+                          self.max_timeout)
+
+    def update(self, query_indices: np.ndarray, target_positions: np.ndarray,
+               elapsed: np.ndarray, solved: np.ndarray) -> None:
+        """Update with query results (nothing to do for this policy)
+
+        Args:
+            query_indices (np.ndarray): The indices of the queried (training) instances.
+            target_positions (np.ndarray): The positions of the queried targets (i.e., solvers).
+            elapsed (np.ndarray): The solver time spent on each query so far, i.e., the actual
+                runtime if solved and a lower bound for it otherwise.
+            solved (np.ndarray): Boolean mask indicating which queries returned a label.
+
+        Returns:
+            None.
+        """
+
+
+class RuntimePredictionPolicy:
+    """Runtime-prediction timeout policy
+
+    Timeout policy that predicts the runtime of each instance with a regression model, trained on
+    the (log-transformed) runtimes of the instances queried so far (one model per target, i.e.,
+    solver). For instances which timed out, the runtime is unknown; we use `factor` times the time
+    spent on them as a (rough) estimate. The timeout is the predicted runtime times `margin`, but
+    at least `factor` times the time already spent on the instance (so repeated queries make
+    progress). Thus, compared to `DoublingPolicy`, instances predicted to be hard need fewer query
+    rounds. Uses a `DoublingPolicy` as long as fewer than `min_samples` instances were queried.
+    """
+
+    def __init__(self, X_train: Any, model: Optional[Any] = None, margin: float = 1.5,
+                 min_samples: int = 20, initial_timeout: float = 100, factor: float = 2,
+                 max_timeout: float = al_oracle.COMPETITION_TIMEOUT):
+        """Initializer
+
+        Args:
+            X_train (Any): The feature part of the training set (as returned by oracle).
+            model (Optional[Any], optional): A `sklearn`-compatible regression model (will be
+                cloned for each target). Defaults to None (in which case a decision tree is used).
+            margin (float, optional): Factor on predicted runtimes. Defaults to 1.5.
+            min_samples (int, optional): Minimum number of queried instances to use predictions.
+                Defaults to 20.
+            initial_timeout (float, optional): The timeout of the first query (as long as there
+                are no predictions). Defaults to 100.
+            factor (float, optional): The minimum growth factor of timeouts. Defaults to 2.
+            max_timeout (float, optional): The maximum timeout. Defaults to the timeout of the SAT
+                Competition (for which labels are guaranteed to be returned).
+
+        Returns:
+            None.
+        """
+        if model is None:
+            import sklearn.tree  # deferred, as importing sklearn is slow
+            model = sklearn.tree.DecisionTreeRegressor(min_samples_leaf=5, random_state=25)
+        self.model = model
+        self.margin = margin
+        self.min_samples = min_samples
+        self.fallback_policy = DoublingPolicy(initial_timeout=initial_timeout, factor=factor,
+                                              max_timeout=max_timeout)
+        self.__X_train = np.asarray(X_train, dtype=float)
+        self.__runtimes = {}  # for each target position: dict of instance index -> (est.) runtime
+        self.__models = {}  # for each target position: fitted model (None if not up-to-date)
+
+    def get_timeouts(self, query_indices: np.ndarray, target_positions: np.ndarray,
+                     elapsed: np.ndarray) -> np.ndarray:
+        """Get timeouts
+
+        Args:
+            query_indices (np.ndarray): The indices of the (training) instances to be queried.
+            target_positions (np.ndarray): The positions of the targets (i.e., solvers) to be
+                queried (same shape as `query_indices`).
+            elapsed (np.ndarray): The solver time already spent on each query.
+
+        Returns:
+            np.ndarray: The timeouts (total solver time, including `elapsed`) for the next query.
+        """
+        timeouts = self.fallback_policy.get_timeouts(
+            query_indices=query_indices, target_positions=target_positions, elapsed=elapsed)
+        for target_position in np.unique(target_positions).tolist():
+            runtimes = self.__runtimes.get(target_position, {})
+            if len(runtimes) < self.min_samples:
+                continue
+            if self.__models.get(target_position) is None:  # (re-)fit only if there is new data
+                import sklearn.base  # deferred, as importing sklearn is slow
+                model = sklearn.base.clone(self.model)
+                model.fit(self.__X_train[list(runtimes.keys())], np.log1p(list(runtimes.values())))
+                self.__models[target_position] = model
+            is_target = target_positions == target_position
+            predicted_runtimes = np.expm1(self.__models[target_position].predict(
+                self.__X_train[query_indices[is_target]]))
+            timeouts[is_target] = np.minimum(
+                np.maximum(self.margin * predicted_runtimes,
+                           self.fallback_policy.factor * elapsed[is_target]),
+                self.fallback_policy.max_timeout)
+        return timeouts
+
+    def update(self, query_indices: np.ndarray, target_positions: np.ndarray,
+               elapsed: np.ndarray, solved: np.ndarray) -> None:
+        """Update with query results
+
+        Args:
+            query_indices (np.ndarray): The indices of the queried (training) instances.
+            target_positions (np.ndarray): The positions of the queried targets (i.e., solvers).
+            elapsed (np.ndarray): The solver time spent on each query so far, i.e., the actual
+                runtime if solved and a lower bound for it otherwise.
+            solved (np.ndarray): Boolean mask indicating which queries returned a label.
+
+        Returns:
+            None.
+        """
+        runtimes = np.where(solved, elapsed, np.minimum(self.fallback_policy.factor * elapsed,
+                                                        self.fallback_policy.max_timeout))
+        for query_idx, target_position, runtime in zip(
+                query_indices.tolist(), target_positions.tolist(), runtimes.tolist()):
+            self.__runtimes.setdefault(target_position, {})[query_idx] = runtime
+            self.__models[target_position] = None
+
+
+class TimeoutScheduler:
+    """Timeout scheduler
+
+    Class for resumable label queries on top of an `ALOracle`: Remembers the solver time already
+    spent on each (instance, target) pair, so querying an instance again with a higher timeout only
+    costs the additional time, and instances already solved cost nothing. Optionally enforces a
+    budget of total solver time; the query exceeding it is run with a reduced timeout, later
+    queries are not run at all. Timeouts can be passed explicitly (`query()`) or chosen by a
+    policy (`query_adaptive()`, `query_until_labeled()`).
+    """
+
+    def __init__(self, oracle: al_oracle.ALOracle, budget: Optional[float] = None):
+        """Initializer
+
+        Args:
+            oracle (al_oracle.ALOracle): The oracle, whose data needs to be split already.
+            budget (Optional[float], optional): The maximum total solver time of all queries.
+                Defaults to None (no limit).
+
+        Returns:
+            None.
+        """
+        self.oracle = oracle
+        self.budget = budget
+        shape = (oracle.get_train_size(), len(oracle.get_targets()))
+        self.__elapsed = np.zeros(shape=shape, dtype=float, order='F')
+        self.__labels = np.full(shape=shape, fill_value=al_oracle.LABEL_MISSING, order='F')
+        self.__total_cost = 0.0
+
+    def get_total_cost(self) -> float:
+        """Get total cost
+
+        Returns:
+            float: The total solver time of all queries so far.
+        """
+        return self.__total_cost
+
+    def get_remaining_budget(self) -> float:
+        """Get remaining budget
+
+        Returns:
+            float: The solver time still available (infinite if there is no budget).
+        """
+        if self.budget is None:
+            return float('inf')
+        return max(self.budget - self.__total_cost, 0.0)
+
+    def get_elapsed(self, query_indices: Iterable[int],
+                    targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+                    ) -> np.ndarray:
+        """Get elapsed solver time
+
+        Args:
+            query_indices (Iterable[int]): The indices of the (training) instances.
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The targets
+                (see `ALOracle.query_labels_batch()`). Defaults to None.
+
+        Returns:
+            np.ndarray: The solver time already spent on each (instance, target) pair.
+        """
+        query_indices, target_positions = self.__prepare(query_indices=query_indices,
+                                                         targets=targets)
+        return self.__elapsed[query_indices, target_positions]
+
+    def query(self, query_indices: Iterable[int],
+              query_timeouts: Optional[Union[float, Iterable[float]]] = None,
+              targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Query target labels (resumable)
+
+        Same semantics as `ALOracle.query_labels_batch()`, except for the costs: Each query only
+        costs the solver time exceeding the time already spent on the instance (and target) in
+        previous queries. Timeouts not exceeding this time do not run the solver again. Labels
+        obtained before are returned again at no cost, whatever the timeout.
+
+        Args:
+            query_indices (Iterable[int]): The indices of the (training) instances for which labels
+                should be returned. Each (instance, target) pair may only occur once.
+            query_timeouts (Optional[Union[float, Iterable[float]]], optional): The timeouts (total
+                solver time, including previous queries). Either a scalar or one value per query.
+                Defaults to None (timeout of the SAT Competition).
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The targets
+                (see `ALOracle.query_labels_batch()`). Defaults to None.
+
+        Returns:
+            labels (np.ndarray): The queried labels (float, `LABEL_MISSING` if not solved).
+            costs (np.ndarray): The query costs, i.e., additional solver time.
+            timed_out (np.ndarray): Boolean mask indicating which queries returned no label (timed
+                out or not run since budget exhausted).
+        """
+        query_indices, target_positions = self.__prepare(query_indices=query_indices,
+                                                         targets=targets)
+        if query_timeouts is None:
+            query_timeouts = al_oracle.COMPETITION_TIMEOUT
+        query_timeouts = np.asarray(query_timeouts, dtype=float)
+        if (query_timeouts.ndim > 0) and (query_timeouts.shape != query_indices.shape):
+            raise ValueError('Length of query indices and of timeouts need to match.')
+        query_timeouts = np.broadcast_to(query_timeouts, query_indices.shape)
+        elapsed = self.__elapsed[query_indices, target_positions]
+        labels = self.__labels[query_indices, target_positions]
+        costs = np.zeros(shape=query_indices.shape)
+        run_idx = np.flatnonzero(np.isnan(labels) & (query_timeouts > elapsed))
+        run_labels, run_elapsed, _ = self.oracle.query_labels_batch(
+            query_indices=query_indices[run_idx], query_timeouts=query_timeouts[run_idx],
+            targets=target_positions[run_idx])
+        run_costs = run_elapsed - elapsed[run_idx]
+        cumulative_costs = np.cumsum(run_costs)
+        remaining_budget = self.get_remaining_budget()
+        if (len(run_idx) > 0) and (cumulative_costs[-1] > remaining_budget):
+            last = int(np.argmax(cumulative_costs > remaining_budget))  # run with reduced timeout
+            reduced_timeout = elapsed[run_idx[last]] + remaining_budget - \
+                (cumulative_costs[last - 1] if last > 0 else 0)
+            last_label, last_elapsed, _ = self.oracle.query_labels_batch(
+                query_indices=query_indices[run_idx[last:(last + 1)]],
+                query_timeouts=reduced_timeout, targets=target_positions[run_idx[last:(last + 1)]])
+            run_labels[last], run_elapsed[last] = last_label[0], last_elapsed[0]
+            run_costs[last] = last_elapsed[0] - elapsed[run_idx[last]]
+            run_idx, run_labels = run_idx[:(last + 1)], run_labels[:(last + 1)]
+            run_elapsed, run_costs = run_elapsed[:(last + 1)], run_costs[:(last + 1)]
+        labels[run_idx] = run_labels
+        costs[run_idx] = run_costs
+        self.__labels[query_indices[run_idx], target_positions[run_idx]] = run_labels
+        self.__elapsed[query_indices[run_idx], target_positions[run_idx]] = run_elapsed
+        self.__total_cost += float(run_costs.sum())
+        return labels, costs, np.isnan(labels)
+
+    def query_adaptive(self, query_indices: Iterable[int], policy: Any,
+                       targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Query target labels with timeouts from a policy
+
+        Same as `query()`, but let a `policy` (e.g., `DoublingPolicy`) choose the timeouts based on
+        the solver time already spent on each instance, and inform the policy about the results.
+
+        Args:
+            query_indices (Iterable[int]): The indices of the (training) instances.
+            policy (Any): An object with the methods `get_timeouts()` and `update()`, like the
+                policies in this module.
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The targets
+                (see `ALOracle.query_labels_batch()`). Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Labels, costs, and timeout mask (see
+                `query()`).
+        """
+        query_indices, target_positions = self.__prepare(query_indices=query_indices,
+                                                         targets=targets)
+        elapsed = self.__elapsed[query_indices, target_positions]
+        query_timeouts = policy.get_timeouts(query_indices=query_indices,
+                                             target_positions=target_positions, elapsed=elapsed)
+        labels, costs, timed_out = self.query(query_indices=query_indices,
+                                              query_timeouts=query_timeouts,
+                                              targets=target_positions)
+        policy.update(query_indices=query_indices, target_positions=target_positions,
+                      elapsed=self.__elapsed[query_indices, target_positions], solved=~timed_out)
+        return labels, costs, timed_out
+
+    def query_until_labeled(self, query_indices: Iterable[int], policy: Any,
+                            targets: Optional[Union[int, str, Iterable[Union[int, str]]]] = None
+                            ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Query target labels until solved
+
+        Repeat `query_adaptive()` for all instances without label until all are labeled or the
+        budget is exhausted. Policies need to increase timeouts till the SAT Competition's timeout.
+
+        Args:
+            query_indices (Iterable[int]): The indices of the (training) instances.
+            policy (Any): An object with the methods `get_timeouts()` and `update()`, like the
+                policies in this module.
+            targets (Optional[Union[int, str, Iterable[Union[int, str]]]], optional): The targets
+                (see `ALOracle.query_labels_batch()`). Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Labels, costs (summed over all rounds), and
+                timeout mask (see `query()`).
+        """
+        query_indices, target_positions = self.__prepare(query_indices=query_indices,
+                                                         targets=targets)
+        labels = self.__labels[query_indices, target_positions]
+        costs = np.zeros(shape=query_indices.shape)
+        pending = np.flatnonzero(np.isnan(labels))
+        while (len(pending) > 0) and (self.get_remaining_budget() > 0):
+            elapsed_before = self.__elapsed[query_indices[pending], target_positions[pending]]
+            round_labels, round_costs, round_timed_out = self.query_adaptive(
+                query_indices=query_indices[pending], policy=policy,
+                targets=target_positions[pending])
+            labels[pending] = round_labels
+            costs[pending] += round_costs
+            if np.array_equal(elapsed_before, self.__elapsed[query_indices[pending],
+                                                             target_positions[pending]]):
+                raise ValueError('Policy did not increase the timeouts of unsolved instances.')
+            pending = pending[round_timed_out]
+        return labels, costs, np.isnan(labels)
+
+    def get_statistics(self) -> Dict[str, float]:
+        """Get statistics
+
+        Returns:
+            Dict[str, float]: The total cost, the number of labeled (instance, target) pairs, and
+                the average cost per label.
+        """
+        num_labels = int((~np.isnan(self.__labels)).sum())
+        cost_per_label = self.__total_cost / num_labels if num_labels > 0 else float('nan')
+        return {'total_cost': self.__total_cost, 'num_labels': num_labels,
+                'cost_per_label': cost_per_label}
+
+    # Convert query indices and targets to arrays (with the same shape) and check for duplicates
+    def __prepare(self, query_indices: Iterable[int],
+                  targets: Optional[Union[int, str, Iterable[Union[int, str]]]]
+                  ) -> Tuple[np.ndarray, np.ndarray]:
+        query_indices = np.asarray(query_indices, dtype=int)
+        target_positions = self.oracle.get_target_positions(targets)
+        if (target_positions.ndim > 0) and (target_positions.shape != query_indices.shape):
+            raise ValueError('Length of query indices and of targets need to match.')
+        target_positions = np.broadcast_to(target_positions, query_indices.shape)
+        pair_ids = query_indices * self.__elapsed.shape[1] + target_positions
+        if len(np.unique(pair_ids)) != len(pair_ids):
+            raise ValueError('Each (instance, target) pair may only be queried once per batch.')
+        return query_indices, target_positions
@@ -0,0 +1,276 @@
+"""Query strategies with cached utilities for active learning
+
+Helper module. Provides query strategies that only compute utilities (see `RandomStrategy` and
+`UncertaintyStrategy`, or subclass `QueryStrategy`) and a driver selecting batches based on them
+(see class `ActiveLearningDriver`). The queried instances are the same as with the corresponding
+strategies of `skactiveml.pool` (for the same `random_state`).
+"""
+
+
+import abc
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import skactiveml.pool
+import skactiveml.utils
+import sklearn.tree
+
+import al_oracle
+
+
+class QueryStrategy(abc.ABC):
+    """Query strategy
+
+    Base class for query strategies. Subclasses implement `compute_utilities()` (higher utility
+    means more useful to label) and declare what the utilities depend on, which determines when
+    `ActiveLearningDriver` needs to recompute them: `uses_random_state` (utilities are random,
+    recomputed for each query), `uses_model` (recomputed after the model was updated), or neither
+    (computed once).
+    """
+
+    uses_model = False
+    uses_random_state = False
+
+    def __init__(self, random_state: Optional[Union[int, np.random.RandomState]] = None):
+        """Initializer
+
+        Args:
+            random_state (Optional[Union[int, np.random.RandomState]], optional): The seed for
+                random utilities and tie-breaking (as in `skactiveml`). Defaults to None.
+
+        Returns:
+            None.
+        """
+        self.random_state = random_state
+
+    @abc.abstractmethod
+    def compute_utilities(self, X: np.ndarray, candidates: np.ndarray, model: Optional[Any],
+                          random_state: np.random.RandomState) -> np.ndarray:
+        """Compute utilities
+
+        Args:
+            X (np.ndarray): The features of the pool (i.e., training set).
+            candidates (np.ndarray): The positions of the candidates (i.e., unlabeled instances) in
+                the pool.
+            model (Optional[Any]): The prediction model, fitted on the labeled instances. `None` if
+                no instances are labeled yet.
+            random_state (np.random.RandomState): The random state of the current query.
+
+        Returns:
+            np.ndarray: The utility of each candidate (in the order of `candidates`).
+        """
+
+
+class RandomStrategy(QueryStrategy):
+    """Random sampling
+
+    Same queries as `skactiveml.pool.RandomSampling`.
+    """
+
+    uses_random_state = True
+
+    def compute_utilities(self, X: np.ndarray, candidates: np.ndarray, model: Optional[Any],
+                          random_state: np.random.RandomState) -> np.ndarray:
+        return random_state.random_sample(len(candidates))
+
+
+class UncertaintyStrategy(QueryStrategy):
+    """Uncertainty sampling
+
+    Same queries as `skactiveml.pool.UncertaintySampling` with a
+    `skactiveml.classifier.SklearnClassifier` wrapping the model, but does not refit the model for
+    each query.
+    """
+
+    uses_model = True
+
+    def __init__(self, method: str = 'entropy',
+                 random_state: Optional[Union[int, np.random.RandomState]] = None):
+        """Initializer
+
+        Args:
+            method (str, optional): The uncertainty measure ("entropy", "least_confident", or
+                "margin_sampling"; see `skactiveml.pool.uncertainty_scores()`). Defaults to
+                "entropy".
+            random_state (Optional[Union[int, np.random.RandomState]], optional): The seed for
+                tie-breaking (as in `skactiveml`). Defaults to None.
+
+        Returns:
+            None.
+        """
+        super().__init__(random_state=random_state)
+        self.method = method
+
+    def compute_utilities(self, X: np.ndarray, candidates: np.ndarray, model: Optional[Any],
+                          random_state: np.random.RandomState) -> np.ndarray:
+        probas = predict_proba(model=model, X=X, candidates=candidates)
+        return skactiveml.pool.uncertainty_scores(probas=probas, method=self.method)
+
+
+def predict_proba(model: Optional[Any], X: np.ndarray, candidates: np.ndarray,
+                  classes: np.ndarray = al_oracle.CLASSES) -> np.ndarray:
+    """Predict class probabilities
+
+    Predict probabilities for all `classes`, as `skactiveml.classifier.SklearnClassifier` does,
+    even if the model was only trained on some of them.
+
+    Args:
+        model (Optional[Any]): A fitted `sklearn`-compatible classifier. `None` if no instances are
+            labeled yet, which yields uniform probabilities.
+        X (np.ndarray): The features of the pool.
+        candidates (np.ndarray): The positions of the instances to predict in the pool.
+        classes (np.ndarray, optional): All classes. Defaults to `al_oracle.CLASSES`.
+
+    Returns:
+        np.ndarray: The class probabilities, one row per candidate and one column per class.
+    """
+    if model is None:
+        return np.full(shape=(len(candidates), len(classes)), fill_value=1 / len(classes))
+    if isinstance(model, sklearn.tree.BaseDecisionTree) and X.dtype == np.float32:
+        # Trees predict on float32 anyway; predicting the whole (C-contiguous) pool without input
+        # validation is faster than copying the candidates' rows:
+        probas = model.predict_proba(X, check_input=False)[candidates]
+    else:
+        probas = model.predict_proba(X[candidates])
+    if probas.shape[1] != len(classes):
+        class_positions = np.searchsorted(classes, model.classes_)
+        probas_all = np.zeros(shape=(len(candidates), len(classes)))
+        probas_all[:, class_positions] = 1 if len(class_positions) == 1 else probas
+        probas = probas_all
+    return probas
+
+
+class ActiveLearningDriver:
+    """Active-learning driver
+
+    Class for selecting query batches with a `QueryStrategy`. Keeps the utilities of the pool in an
+    array (labeled instances have utility NaN) and a mask of the unlabeled instances, so utilities
+    are only recomputed when necessary (see `QueryStrategy`) and only for unlabeled instances. The
+    model can be shared with other components (e.g., `al_evaluation.LearningCurveEvaluator`, which
+    fits it anyway) instead of being refit by the driver. Batches are selected with
+    `np.argpartition()` instead of repeatedly searching the maximum over the pool; only ties among
+    the highest utilities are broken in the same (random) way as `skactiveml`.
+    """
+
+    def __init__(self, X_train: pd.DataFrame, strategy: QueryStrategy, model: Optional[Any] = None,
+                 fit_model: bool = False):
+        """Initializer
+
+        Args:
+            X_train (pd.DataFrame): The feature part of the training set (as returned by oracle).
+            strategy (QueryStrategy): The query strategy.
+            model (Optional[Any], optional): A `sklearn`-compatible classifier for the strategy.
+                Defaults to None (only allowed if the strategy does not use a model).
+            fit_model (bool, optional): Whether `update()` should fit the model on all labeled
+                instances. If False, the model needs to be fitted elsewhere before the next query.
+                Defaults to False.
+
+        Returns:
+            None.
+        """
+        if strategy.uses_model and model is None:
+            raise ValueError('The query strategy needs a model.')
+        self.strategy = strategy
+        self.model = model
+        self.__fit_model = fit_model
+        # Features as decision trees use them internally (yields same predictions, but faster):
+        dtype = np.float32 if isinstance(model, sklearn.tree.BaseDecisionTree) else float
+        self.__X_train = np.ascontiguousarray(X_train.to_numpy(dtype=dtype))
+        self.__y_train = np.full(shape=len(X_train), fill_value=skactiveml.utils.MISSING_LABEL)
+        self.__is_unlabeled = np.ones(shape=len(X_train), dtype=bool)
+        self.__utilities = np.full(shape=len(X_train), fill_value=np.nan)
+        self.__utilities_valid = False
+
+    def get_num_unlabeled(self) -> int:
+        """Get number of unlabeled instances
+
+        Returns:
+            int: The number of training instances not labeled yet.
+        """
+        return int(self.__is_unlabeled.sum())
+
+    def get_utilities(self) -> np.ndarray:
+        """Get utilities
+
+        Returns:
+            np.ndarray: The utilities of the latest query (NaN for labeled instances).
+        """
+        return self.__utilities.copy()
+
+    def query(self, batch_size: int = 1) -> np.ndarray:
+        """Query batch
+
+        Args:
+            batch_size (int, optional): The number of instances to query (at most the number of
+                unlabeled instances). Defaults to 1.
+
+        Returns:
+            np.ndarray: The indices of the queried (training) instances, ordered by utility.
+        """
+        num_unlabeled = self.get_num_unlabeled()
+        # Same random state as skactiveml, which derives a new one from seed and pool size:
+        random_state = skactiveml.utils.check_random_state(self.strategy.random_state,
+                                                           num_unlabeled + 1)
+        candidates = np.flatnonzero(self.__is_unlabeled)
+        if self.strategy.uses_random_state or not self.__utilities_valid:
+            model = self.model if (self.strategy.uses_model and
+                                   num_unlabeled < len(self.__is_unlabeled)) else None
+            self.__utilities[candidates] = self.strategy.compute_utilities(
+                X=self.__X_train, candidates=candidates, model=model, random_state=random_state)
+            self.__utilities_valid = True
+        return _select_batch(utilities=self.__utilities, candidates=candidates,
+                             batch_size=min(batch_size, num_unlabeled), random_state=random_state)
+
+    def update(self, query_indices: Iterable[int], labels: Optional[Iterable[float]] = None
+               ) -> None:
+        """Add labeled instances
+
+        Mark instances as labeled and (if the strategy depends on the model) invalidate the
+        utilities, as the model changes.
+
+        Args:
+            query_indices (Iterable[int]): The indices of the newly labeled (training) instances.
+            labels (Optional[Iterable[float]], optional): The labels of these instances (as used for
+                training). Only necessary if the driver fits the model. Defaults to None.
+
+        Returns:
+            None.
+        """
+        query_indices = np.asarray(query_indices, dtype=int)
+        self.__is_unlabeled[query_indices] = False
+        self.__utilities[query_indices] = np.nan
+        if self.__fit_model:
+            if labels is None:
+                raise ValueError('Labels are necessary to fit the model.')
+            self.__y_train[query_indices] = labels
+            is_labeled = ~self.__is_unlabeled
+            self.model.fit(self.__X_train[is_labeled], self.__y_train[is_labeled].astype(int))
+        if self.strategy.uses_model:
+            self.__utilities_valid = False
+
+
+# Select the candidates with the highest utilities; break ties like skactiveml.utils.simple_batch()
+def _select_batch(utilities: np.ndarray, candidates: np.ndarray, batch_size: int,
+                  random_state: np.random.RandomState) -> np.ndarray:
+    if batch_size == 0:
+        return np.empty(shape=0, dtype=int)
+    candidate_utilities = utilities[candidates]
+    kth_position = np.argpartition(candidate_utilities, -batch_size)[-batch_size]
+    top_candidates = candidates[candidate_utilities >= candidate_utilities[kth_position]]
+    top_candidates = top_candidates[np.argsort(-utilities[top_candidates], kind='stable')]
+    top_utilities = utilities[top_candidates]
+    if len(top_candidates) == batch_size and (np.diff(top_utilities) < 0).all():
+        return top_candidates  # no ties, so random tie-breaking would not change the batch
+    # skactiveml draws one random number per pool instance for each pick and selects the tied
+    # instance with the highest number:
+    query_indices = np.empty(shape=batch_size, dtype=int)
+    is_remaining = np.ones(shape=len(top_candidates), dtype=bool)
+    for i in range(batch_size):
+        random_numbers = random_state.random_sample(len(utilities))
+        max_utility = top_utilities[is_remaining].max()
+        tied_positions = np.flatnonzero(is_remaining & (top_utilities == max_utility))
+        position = tied_positions[np.argmax(random_numbers[top_candidates[tied_positions]])]
+        query_indices[i] = top_candidates[position]
+        is_remaining[position] = False
+    return query_indices
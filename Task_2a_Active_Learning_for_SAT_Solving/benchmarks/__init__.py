@@ -0,0 +1,5 @@
+"""Benchmarks for the SAT-solving task
+
+Package with scripts that measure the performance of our helper modules. Run the scripts as modules
+from the task's folder, e.g., `python -m benchmarks.query_labels`.
+"""
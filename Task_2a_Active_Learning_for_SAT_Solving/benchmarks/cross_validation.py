@@ -0,0 +1,70 @@
+"""Benchmark multi-split oracle
+
+Script that compares creating one `ALOracle` (and holdout split) per seed with one oracle for all
+splits (`create_splits()`), measuring time and peak memory for creating the splits plus selecting
+each split (i.e., obtaining its features) once, as well as the memory of the stored split indices.
+Also runs repeated cross-validation. Uses synthetic data, so no prepared dataset is necessary.
+"""
+
+
+import time
+import tracemalloc
+
+import pandas as pd
+
+import al_oracle
+from benchmarks import synthetic
+
+
+NUM_FEATURES = 100
+NUM_FOLDS = 5
+NUM_INSTANCES = [5000, 50000]
+SEEDS = list(range(10))
+
+
+def split_per_seed(dataset):
+    oracles = []  # keep all oracles, as when evaluating the splits later
+    for seed in SEEDS:
+        oracle = al_oracle.ALOracle()
+        oracle.split_data(dataset=dataset, target=al_oracle.DEFAULT_SOLVER, random_state=seed)
+        oracles.append(oracle)
+
+
+def split_multi(dataset, num_folds=None):
+    oracle = al_oracle.ALOracle()
+    split_ids = oracle.create_splits(dataset=dataset, target=al_oracle.DEFAULT_SOLVER,
+                                     seeds=SEEDS, num_folds=num_folds)
+    for split_id in split_ids:
+        oracle.select_split(split_id)
+    return oracle
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    func()
+    end_time = time.perf_counter()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_s': end_time - start_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    # Warm-up, so the first scenario does not include the deferred import of sklearn:
+    split_multi(dataset=synthetic.create_dataset(num_instances=1000, num_features=NUM_FEATURES),
+                num_folds=NUM_FOLDS)
+    results = []
+    for num_instances in NUM_INSTANCES:
+        dataset = synthetic.create_dataset(num_instances=num_instances, num_features=NUM_FEATURES)
+        scenarios = {'one oracle per seed (holdout)': split_per_seed,
+                     'multi-split oracle (holdout)': split_multi,
+                     f'multi-split oracle ({NUM_FOLDS} folds)':
+                         lambda dataset: split_multi(dataset=dataset, num_folds=NUM_FOLDS)}
+        for name, func in scenarios.items():
+            results.append({'num_instances': num_instances, 'scenario': name,
+                            **measure(lambda: func(dataset=dataset))})
+        oracle = split_multi(dataset=dataset, num_folds=NUM_FOLDS)
+        index_memory = sum(indices.nbytes for split_indices in oracle.get_split_indices().values()
+                           for indices in split_indices.values())
+        results[-1]['split_indices_mb'] = index_memory / 2**20
+    print(pd.DataFrame(results).round(3).to_string(index=False))
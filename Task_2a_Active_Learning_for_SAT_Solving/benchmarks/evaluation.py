@@ -0,0 +1,83 @@
+"""Benchmark learning-curve evaluation
+
+Script that compares the per-iteration overhead of evaluating an active-learning model as in the
+demo notebooks (refit on labeled data, predict all three splits separately, score with `sklearn`)
+with `al_evaluation.LearningCurveEvaluator`, for a batch of 20 newly labeled instances. Uses
+synthetic data, so no prepared dataset is necessary.
+"""
+
+
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn.linear_model
+import sklearn.metrics
+import sklearn.tree
+
+import al_evaluation
+import al_oracle
+from benchmarks import synthetic
+
+
+BATCH_SIZE = 20
+MODELS = {
+    'DecisionTree': lambda: sklearn.tree.DecisionTreeClassifier(random_state=25),
+    'SGD': lambda: sklearn.linear_model.SGDClassifier(random_state=25)
+}
+NUM_FEATURES = 50
+NUM_INSTANCES = 5000
+NUM_LABELED = [100, 1000, 3000]  # labeled instances before the benchmarked iteration
+NUM_REPETITIONS = 10
+
+
+def time_notebook(create_model, X_train, X_test, y_train, y_test, labeled_idx, y_labeled):
+    start_time = time.perf_counter()
+    model = create_model()
+    X_train_labeled = X_train.iloc[labeled_idx]
+    y_train_labeled = pd.Series(y_labeled)
+    model.fit(X=X_train_labeled, y=y_train_labeled)
+    y_pred = model.predict(X=X_train_labeled)
+    sklearn.metrics.matthews_corrcoef(y_true=y_train_labeled, y_pred=y_pred)
+    y_pred = pd.Series(model.predict(X=X_train))  # scoring as in old `ALOracle.score()`
+    assert y_pred.isin([0, 1]).all()
+    sklearn.metrics.matthews_corrcoef(y_true=y_train, y_pred=y_pred)
+    y_pred = pd.Series(model.predict(X=X_test))
+    assert y_pred.isin([0, 1]).all()
+    sklearn.metrics.matthews_corrcoef(y_true=y_test, y_pred=y_pred)
+    return time.perf_counter() - start_time
+
+
+def time_evaluator(create_model, oracle, X_train, X_test, labeled_idx, y_labeled):
+    evaluator = al_evaluation.LearningCurveEvaluator(
+        model=create_model(), oracle=oracle, X_train=X_train, X_test=X_test)
+    evaluator.update(query_indices=labeled_idx[:-BATCH_SIZE], labels=y_labeled[:-BATCH_SIZE])
+    start_time = time.perf_counter()  # only time the iteration adding the latest batch
+    evaluator.update(query_indices=labeled_idx[-BATCH_SIZE:], labels=y_labeled[-BATCH_SIZE:])
+    evaluator.evaluate()
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    dataset = synthetic.create_dataset(num_instances=NUM_INSTANCES, num_features=NUM_FEATURES)
+    oracle = al_oracle.ALOracle()
+    X_train, X_test = oracle.split_data(dataset=dataset, target=al_oracle.DEFAULT_SOLVER)
+    y_train = oracle.query_labels_batch(query_indices=range(len(X_train)))[0].astype(int)
+    rng = np.random.default_rng(seed=25)
+    y_test = rng.integers(low=0, high=2, size=len(X_test))  # only for timing, not a real label
+    results = []
+    for model_name, create_model in MODELS.items():
+        for num_labeled in NUM_LABELED:
+            labeled_idx = rng.permutation(len(X_train))[:(num_labeled + BATCH_SIZE)]
+            y_labeled = y_train[labeled_idx]
+            result = {'model': model_name, 'num_labeled': num_labeled}
+            result['notebook_ms'] = 1000 * min(time_notebook(
+                create_model=create_model, X_train=X_train, X_test=X_test, y_train=y_train,
+                y_test=y_test, labeled_idx=labeled_idx, y_labeled=y_labeled)
+                for _ in range(NUM_REPETITIONS))
+            result['evaluator_ms'] = 1000 * min(time_evaluator(
+                create_model=create_model, oracle=oracle, X_train=X_train, X_test=X_test,
+                labeled_idx=labeled_idx, y_labeled=y_labeled) for _ in range(NUM_REPETITIONS))
+            result['speedup'] = result['notebook_ms'] / result['evaluator_ms']
+            results.append(result)
+    print(pd.DataFrame(results).round(3).to_string(index=False))
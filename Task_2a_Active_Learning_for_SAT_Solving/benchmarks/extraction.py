@@ -0,0 +1,34 @@
+"""Benchmark data extraction in prepare_data.py
+
+Script that compares the end-to-end time of creating the dataset from the GBD databases via the
+GBD API (plus CSV export) with reading these databases directly via `sqlite3`, and checks that both
+ways create the same dataset. Needs the databases and runtime data downloaded by `prepare_data.py`
+in `prepare_data.DATA_DIR`; the prepared dataset itself is not changed.
+"""
+
+
+import time
+
+import pandas as pd
+
+import prepare_data
+
+
+OUT_FILES = {'gbd': 'dataset_gbd.csv', 'sqlite': 'dataset_sqlite.csv'}  # temporary files
+
+
+if __name__ == '__main__':
+    results = []
+    for mode, out_file in OUT_FILES.items():
+        start_time = time.perf_counter()
+        if mode == 'gbd':
+            for db_name in prepare_data.DATABASE_NAMES:
+                prepare_data.export_database_with_api(db_name=db_name)
+        prepare_data.create_dataset(mode=mode, out_file=out_file)
+        end_time = time.perf_counter()
+        results.append({'mode': mode, 'time_s': end_time - start_time})
+    datasets = [(prepare_data.DATA_DIR / out_file).read_text() for out_file in OUT_FILES.values()]
+    assert datasets[0] == datasets[1], 'Both extraction modes should yield the same dataset.'
+    for out_file in OUT_FILES.values():
+        (prepare_data.DATA_DIR / out_file).unlink()
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,84 @@
+"""Benchmark history
+
+Helper module for the benchmarks. Stores benchmark results (together with the current commit and
+a timestamp) in a CSV file and compares new results with the previous run, to detect performance
+regressions between commits. See function `save_and_compare()` for more information.
+"""
+
+
+import datetime
+import pathlib
+import subprocess
+from typing import Sequence
+
+import pandas as pd
+
+
+DEFAULT_HISTORY_PATH = pathlib.Path('benchmarks/results/history.csv')  # relative to task folder
+REGRESSION_THRESHOLD = 1.2  # flag results slower than this factor times the previous run
+
+
+def get_commit() -> str:
+    """Get current commit
+
+    Returns:
+        str: The (abbreviated) hash of the current git commit, plus "-dirty" if there are
+            uncommitted changes; "unknown" if it cannot be determined.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                check=True, text=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                 capture_output=True, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if changes != '' else '')
+
+
+def save_and_compare(results: pd.DataFrame, benchmark: str, key_columns: Sequence[str],
+                     value_column: str = 'time_s',
+                     path: pathlib.Path = DEFAULT_HISTORY_PATH) -> pd.DataFrame:
+    """Save benchmark results and compare them with the previous run
+
+    Append the `results` to the history file and compare each result with the result of the
+    previous run of the same benchmark (if any) having the same values in the `key_columns`.
+
+    Args:
+        results (pd.DataFrame): The benchmark results, one row per measurement.
+        benchmark (str): The name of the benchmark.
+        key_columns (Sequence[str]): The columns identifying a measurement (e.g., scenario and
+            dataset size).
+        value_column (str, optional): The measured value (lower is better). Defaults to "time_s".
+        path (pathlib.Path, optional): The history file (will be created if not existing).
+            Defaults to DEFAULT_HISTORY_PATH.
+
+    Returns:
+        pd.DataFrame: The `key_columns`, the current and previous value (plus the commit of the
+            previous run), their ratio, and whether the ratio exceeds `REGRESSION_THRESHOLD`.
+    """
+    path = pathlib.Path(path)
+    results = results.copy()
+    results.insert(loc=0, column='benchmark', value=benchmark)
+    results.insert(loc=1, column='commit', value=get_commit())
+    results.insert(loc=2, column='timestamp', value=datetime.datetime.now().isoformat())
+    if path.exists():
+        history = pd.read_csv(path)
+        history = history[history['benchmark'] == benchmark]
+    else:
+        history = pd.DataFrame(columns=results.columns)
+    comparison = results[list(key_columns) + [value_column]]
+    if len(history) > 0:
+        previous = history[history['timestamp'] == history['timestamp'].max()]
+        previous = previous[list(key_columns) + [value_column, 'commit']].rename(
+            columns={value_column: f'previous_{value_column}', 'commit': 'previous_commit'})
+        for col in key_columns:  # after reading CSV, dtypes might differ (e.g., int vs. float)
+            previous[col] = previous[col].astype(comparison[col].dtype)
+        comparison = comparison.merge(previous, on=list(key_columns), how='left')
+    else:
+        comparison = comparison.assign(**{f'previous_{value_column}': float('nan'),
+                                          'previous_commit': None})
+    comparison['ratio'] = comparison[value_column] / comparison[f'previous_{value_column}']
+    comparison['regression'] = comparison['ratio'] > REGRESSION_THRESHOLD
+    path.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(path, mode='a', header=not path.exists(), index=False)
+    return comparison
@@ -0,0 +1,98 @@
+"""Benchmark import time
+
+Script that measures the cold start of short jobs (as run in worker processes), i.e., a new
+interpreter importing our modules, with `python -X importtime`: importing `al_oracle`,
+`al_scheduler`, and `score`, as well as validating one submission (as `score.py` does). Checks
+that each job stays within its time budget and does not import heavy packages it does not need.
+Uses synthetic data, so no prepared dataset is necessary.
+"""
+
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+BUDGETS_S = {  # wall time incl. interpreter startup (measured: 0.7 s; 1.5 s with sklearn)
+    'import al_oracle': 1.0, 'import al_scheduler': 1.0, 'import score': 1.0,
+    'validate submission': 1.0
+}
+HEAVY_PACKAGES = ['sklearn', 'scipy', 'skactiveml']  # none of the jobs needs them
+JOBS = {
+    'import al_oracle': 'import al_oracle',
+    'import al_scheduler': 'import al_scheduler',
+    'import score': 'import score',
+    'validate submission': """
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+import score
+ground_truth = pd.read_csv(sys.argv[1])
+validity_status, _ = score.validate_submission(
+    submission_file=pathlib.Path(sys.argv[2]), ground_truth_ids=pd.Index(ground_truth['hash']),
+    classes=np.unique(ground_truth['result']), target='result')
+assert validity_status == 'Valid.'
+"""
+}
+NUM_INSTANCES = 1000
+NUM_REPETITIONS = 5  # use the fastest run, as the first one may also load files from disk
+TASK_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def run_job(code: str, args: Sequence[str]) -> Dict[str, Any]:
+    """Run job
+
+    Args:
+        code (str): The Python code to run in a new interpreter.
+        args (Sequence[str]): Command-line arguments for the code.
+
+    Returns:
+        Dict[str, Any]: The wall time, the (cumulative) time of all top-level imports, and the
+            heavy packages imported.
+    """
+    start_time = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code, *args],
+                             cwd=TASK_DIR, check=True, capture_output=True, text=True)
+    wall_time = time.perf_counter() - start_time
+    import_time = 0
+    imported_packages = set()
+    for line in process.stderr.splitlines():  # format: "import time: self | cumulative | name"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not name.startswith('  '):  # only top-level imports (nested ones are indented)
+            import_time += int(cumulative_us) / 1e6
+        imported_packages.add(name.strip().split('.')[0])
+    return {'wall_s': wall_time, 'import_s': import_time,
+            'heavy_packages': sorted(imported_packages.intersection(HEAVY_PACKAGES))}
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(seed=25)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ground_truth_path = pathlib.Path(temp_dir) / 'result_y_test.csv'
+        submission_path = pathlib.Path(temp_dir) / 'result_team_prediction.csv'
+        ids = [f'{i:032x}' for i in range(NUM_INSTANCES)]
+        pd.DataFrame({'hash': ids, 'result': rng.choice(['sat', 'unsat'], size=NUM_INSTANCES)}
+                     ).to_csv(ground_truth_path, index=False)
+        pd.DataFrame({'hash': ids, 'result': rng.choice(['sat', 'unsat'], size=NUM_INSTANCES)}
+                     ).to_csv(submission_path, index=False)
+        for name, code in JOBS.items():
+            runs = [run_job(code=code, args=[str(ground_truth_path), str(submission_path)])
+                    for _ in range(NUM_REPETITIONS)]
+            result = min(runs, key=lambda x: x['wall_s'])
+            results.append({'job': name, **result, 'budget_s': BUDGETS_S[name],
+                            'within_budget': (result['wall_s'] <= BUDGETS_S[name]) and
+                            (len(result['heavy_packages']) == 0)})
+    results = pd.DataFrame(results)
+    print(results.round(3).to_string(index=False))
+    if not results['within_budget'].all():
+        sys.exit('At least one job exceeded its budget or imported heavy packages.')
@@ -0,0 +1,58 @@
+"""Benchmark loading the dataset
+
+Script that compares load time and peak memory of parsing the whole dataset CSV with `pandas`
+against loading (parts of) the binary cache from `dataset_cache`. Uses synthetic data (with about
+as many columns as the real dataset), so no prepared dataset is necessary.
+"""
+
+
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import al_oracle
+import dataset_cache
+from benchmarks import synthetic
+
+
+NUM_FEATURES = 400
+NUM_INSTANCES = [5000, 50000]
+NUM_SOLVERS = 28
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    func()
+    end_time = time.perf_counter()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_s': end_time - start_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    results = []
+    for num_instances in NUM_INSTANCES:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = pathlib.Path(temp_dir) / 'dataset.csv'
+            synthetic.create_dataset(num_instances=num_instances, num_features=NUM_FEATURES,
+                                     num_solvers=NUM_SOLVERS).to_csv(csv_path, index=False)
+            dataset_cache.load_dataset(csv_path=csv_path, columns=['hash'])  # create cache
+            scenarios = {
+                'read_csv (all)': lambda: pd.read_csv(csv_path),
+                'cache (all)': lambda: dataset_cache.load_dataset(csv_path=csv_path),
+                'read_csv (features)': lambda: pd.read_csv(csv_path, usecols=lambda x: x.startswith(
+                    ('base.', 'gate.'))),
+                'cache (features)': lambda: dataset_cache.load_dataset(
+                    csv_path=csv_path, prefixes=['base.', 'gate.']),
+                'read_csv (one solver)': lambda: pd.read_csv(
+                    csv_path, usecols=[al_oracle.DEFAULT_SOLVER]),
+                'cache (one solver)': lambda: dataset_cache.load_dataset(
+                    csv_path=csv_path, columns=[al_oracle.DEFAULT_SOLVER])
+            }
+            for name, func in scenarios.items():
+                results.append({'num_instances': num_instances, 'scenario': name, **measure(func)})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
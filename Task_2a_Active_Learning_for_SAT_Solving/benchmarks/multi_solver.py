@@ -0,0 +1,67 @@
+"""Benchmark multi-solver oracle
+
+Script that compares creating one `ALOracle` (and data split) per solver with one oracle for all
+solvers (`split_data_multi_solver()`), measuring time and peak memory for splitting plus querying
+a batch of labels for each solver. Uses synthetic data, so no prepared dataset is necessary.
+"""
+
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+from benchmarks import synthetic
+
+
+BATCH_SIZE = 1000
+NUM_FEATURES = 100
+NUM_INSTANCES = [5000, 50000]
+NUM_SOLVERS = 28
+
+
+def query_per_solver(dataset, solvers, query_indices, query_timeouts):
+    splits = []  # keep all oracles and splits, as when comparing solvers in one process
+    for solver in solvers:
+        oracle = al_oracle.ALOracle()
+        X_train, X_test = oracle.split_data(dataset=dataset, target=solver)
+        oracle.query_labels_batch(query_indices=query_indices, query_timeouts=query_timeouts)
+        splits.append((oracle, X_train, X_test))
+
+
+def query_multi_solver(dataset, solvers, query_indices, query_timeouts):
+    oracle = al_oracle.ALOracle()
+    X_train, X_test = oracle.split_data_multi_solver(dataset=dataset, solvers=solvers)
+    oracle.query_labels_batch(query_indices=np.tile(query_indices, len(solvers)),
+                              query_timeouts=np.tile(query_timeouts, len(solvers)),
+                              targets=np.repeat(np.arange(len(solvers)), len(query_indices)))
+
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    func()
+    end_time = time.perf_counter()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_s': end_time - start_time, 'peak_memory_mb': peak_memory / 2**20}
+
+
+if __name__ == '__main__':
+    results = []
+    rng = np.random.default_rng(seed=25)
+    for num_instances in NUM_INSTANCES:
+        dataset = synthetic.create_dataset(num_instances=num_instances, num_features=NUM_FEATURES,
+                                           num_solvers=NUM_SOLVERS)
+        solvers = [x for x in dataset.columns if x.startswith('runtimes.')]
+        query_indices = rng.choice(int(0.8 * num_instances), size=BATCH_SIZE, replace=False)
+        query_timeouts = rng.uniform(low=0, high=al_oracle.COMPETITION_TIMEOUT, size=BATCH_SIZE)
+        scenarios = {'one oracle per solver': query_per_solver,
+                     'multi-solver oracle': query_multi_solver}
+        for name, func in scenarios.items():
+            results.append({'num_instances': num_instances, 'scenario': name, **measure(
+                lambda: func(dataset=dataset, solvers=solvers, query_indices=query_indices,
+                             query_timeouts=query_timeouts))})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,74 @@
+"""Benchmark label queries of the active-learning oracle
+
+Script that compares the runtime of the (former) loop-based label queries with the vectorized
+batch queries of `ALOracle`, for several batch sizes up to the full pool. Uses synthetic data, so
+no prepared dataset is necessary.
+"""
+
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+from benchmarks import synthetic
+
+
+BATCH_SIZES = [20, 100, 1000, 'all']
+NUM_INSTANCES = 5000
+NUM_REPETITIONS = 10
+QUERY_TIMEOUT = 1000
+SEED = 25
+
+
+# Reference implementation: label queries as done before the vectorized batch mode existed
+def query_labels_loop(runtimes: pd.Series, y: pd.Series, query_indices, query_timeouts):
+    results = []
+    for query_idx, query_timeout in zip(query_indices, query_timeouts):
+        actual_runtime = runtimes.iloc[query_idx]
+        if query_timeout < actual_runtime:
+            label = al_oracle.LABEL_MISSING
+            cost = query_timeout
+        else:
+            label = y.iloc[query_idx]
+            cost = actual_runtime
+        results.append({'query_index': query_idx, 'label': label, 'cost': cost})
+    return results
+
+
+if __name__ == '__main__':
+    dataset = synthetic.create_dataset(num_instances=NUM_INSTANCES, seed=SEED)
+    oracle = al_oracle.ALOracle()
+    oracle.split_data(dataset=dataset, target=al_oracle.DEFAULT_SOLVER, test_size=0)
+    runtimes = dataset[al_oracle.DEFAULT_SOLVER]
+    y = (runtimes == 2 * al_oracle.COMPETITION_TIMEOUT).astype(int)
+    runtimes = runtimes.replace(2 * al_oracle.COMPETITION_TIMEOUT, al_oracle.COMPETITION_TIMEOUT)
+    rng = np.random.default_rng(seed=SEED)
+    results = []
+    for batch_size in BATCH_SIZES:
+        if batch_size == 'all':
+            batch_size = NUM_INSTANCES
+        query_indices = rng.permutation(NUM_INSTANCES)[:batch_size]
+        query_timeouts = [QUERY_TIMEOUT] * batch_size
+        # Sanity check: all implementations yield the same labels and costs
+        loop_results = pd.DataFrame(query_labels_loop(
+            runtimes=runtimes, y=y, query_indices=query_indices, query_timeouts=query_timeouts))
+        labels, costs, _ = oracle.query_labels_batch(query_indices=query_indices,
+                                                     query_timeouts=QUERY_TIMEOUT)
+        assert np.allclose(loop_results['cost'], costs)
+        assert np.array_equal(loop_results['label'], labels, equal_nan=True)
+        timings = {
+            'loop': lambda: query_labels_loop(runtimes=runtimes, y=y, query_indices=query_indices,
+                                              query_timeouts=query_timeouts),
+            'dicts': lambda: oracle.query_labels(query_indices=query_indices,
+                                                 query_timeouts=query_timeouts),
+            'batch': lambda: oracle.query_labels_batch(query_indices=query_indices,
+                                                       query_timeouts=QUERY_TIMEOUT)
+        }
+        result = {'batch_size': batch_size}
+        for name, func in timings.items():
+            result[f'{name}_ms'] = min(timeit.repeat(func, number=1, repeat=NUM_REPETITIONS)) * 1000
+        result['speedup'] = result['loop_ms'] / result['batch_ms']
+        results.append(result)
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,101 @@
+"""Benchmark query strategies
+
+Script that compares the time for selecting query batches with `skactiveml.pool` strategies (as
+formerly in `al_runner`, where uncertainty sampling refits its model for each query) with
+`al_strategies.ActiveLearningDriver` (cached utilities, model shared with the learning-curve
+evaluation), over several active-learning iterations, and checks that both query the same
+instances. The model fitting for evaluation is not timed, as both variants need it. Uses synthetic
+data, so no prepared dataset is necessary.
+"""
+
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import skactiveml.classifier
+import skactiveml.pool
+import skactiveml.utils
+import sklearn.tree
+
+import al_oracle
+import al_strategies
+from benchmarks import synthetic
+
+
+BATCH_SIZE = 20
+NUM_FEATURES = 100
+NUM_INSTANCES = [5000, 50000]
+NUM_ITERATIONS = 20
+SEED = 25
+
+
+def query_skactiveml(X_train, y_train, strategy):
+    if strategy == 'Random':
+        qs_model = skactiveml.pool.RandomSampling(random_state=SEED)
+    else:
+        qs_model = skactiveml.pool.UncertaintySampling(method='entropy', random_state=SEED)
+    clf_model = skactiveml.classifier.SklearnClassifier(
+        estimator=sklearn.tree.DecisionTreeClassifier(random_state=SEED), classes=(0, 1),
+        random_state=SEED)
+    y_train_al = np.full(shape=len(X_train), fill_value=skactiveml.utils.MISSING_LABEL)
+    model = sklearn.tree.DecisionTreeClassifier(random_state=SEED)  # for evaluation
+    query_time = 0
+    all_query_idx = []
+    for _ in range(NUM_ITERATIONS):
+        start_time = time.perf_counter()
+        if strategy == 'Random':
+            query_idx = qs_model.query(X=X_train, y=y_train_al, batch_size=BATCH_SIZE)
+        else:
+            query_idx = qs_model.query(X=X_train, y=y_train_al, clf=clf_model,
+                                       batch_size=BATCH_SIZE)
+        query_time += time.perf_counter() - start_time
+        y_train_al[query_idx] = y_train[query_idx]
+        all_query_idx.append(query_idx)
+        model.fit(X_train[~np.isnan(y_train_al)], y_train_al[~np.isnan(y_train_al)])
+    return query_time, np.concatenate(all_query_idx)
+
+
+def query_driver(X_train, y_train, strategy):
+    if strategy == 'Random':
+        qs_model = al_strategies.RandomStrategy(random_state=SEED)
+    else:
+        qs_model = al_strategies.UncertaintyStrategy(method='entropy', random_state=SEED)
+    model = sklearn.tree.DecisionTreeClassifier(random_state=SEED)  # for evaluation
+    driver = al_strategies.ActiveLearningDriver(X_train=pd.DataFrame(X_train), strategy=qs_model,
+                                                model=model)
+    is_labeled = np.zeros(shape=len(X_train), dtype=bool)
+    query_time = 0
+    all_query_idx = []
+    for _ in range(NUM_ITERATIONS):
+        start_time = time.perf_counter()
+        query_idx = driver.query(batch_size=BATCH_SIZE)
+        query_time += time.perf_counter() - start_time
+        is_labeled[query_idx] = True
+        all_query_idx.append(query_idx)
+        model.fit(X_train[is_labeled], y_train[is_labeled])
+        start_time = time.perf_counter()
+        driver.update(query_indices=query_idx)
+        query_time += time.perf_counter() - start_time
+    return query_time, np.concatenate(all_query_idx)
+
+
+if __name__ == '__main__':
+    warnings.filterwarnings(message='.*could not be fitted.*', action='ignore')
+    results = []
+    for num_instances in NUM_INSTANCES:
+        dataset = synthetic.create_dataset(num_instances=num_instances, num_features=NUM_FEATURES)
+        X_train = dataset.filter(regex='^(base|gate)\\.').to_numpy()
+        y_train = (dataset[al_oracle.DEFAULT_SOLVER] == 2 * al_oracle.COMPETITION_TIMEOUT).astype(
+            int).to_numpy()
+        for strategy in ['Random', 'Uncertainty-Entropy']:
+            skactiveml_time, skactiveml_idx = query_skactiveml(X_train=X_train, y_train=y_train,
+                                                               strategy=strategy)
+            driver_time, driver_idx = query_driver(X_train=X_train, y_train=y_train,
+                                                   strategy=strategy)
+            results.append({'num_instances': num_instances, 'strategy': strategy,
+                            'skactiveml_s': skactiveml_time, 'driver_s': driver_time,
+                            'speedup': skactiveml_time / driver_time,
+                            'same_queries': np.array_equal(skactiveml_idx, driver_idx)})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
@@ -0,0 +1,97 @@
+"""Benchmark scale-up
+
+Script that measures the end-to-end runtime of our pipeline on synthetic datasets (with the same
+columns as the real dataset) with 1x to 100x the size of the real dataset (see `SCALE_FACTORS`):
+splitting the data (`split.py`), predicting (`predict_majority.py`, `predict_tree.py`), and scoring
+(`score.py`), each run as a separate process in a temporary directory, as well as splitting,
+querying all labels of the pool, and scoring with `ALOracle`. Appends the results to the benchmark
+history (see `benchmarks.history`) and compares them with the previous run, to detect regressions
+between commits.
+"""
+
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+from benchmarks import history
+from benchmarks import synthetic
+
+
+BASE_NUM_INSTANCES = 5000  # about the size of the real dataset
+NUM_FEATURES = 100
+SCALE_FACTORS = [1, 10, 100]  # larger factors (e.g., 1000) work as well but take much longer
+SCRIPTS = ['split.py', 'predict_majority.py', 'predict_tree.py', 'score.py']
+TASK_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+def run_script(script: str, work_dir: pathlib.Path) -> float:
+    """Run script
+
+    Args:
+        script (str): The file name of the script (in the task folder).
+        work_dir (pathlib.Path): The working directory, containing the "data/" directory.
+
+    Returns:
+        float: The wall time of running the script, including interpreter startup and imports.
+    """
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, str(TASK_DIR / script)], cwd=work_dir, check=True,
+                   env={**os.environ, 'PYTHONPATH': str(TASK_DIR)}, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start_time
+
+
+def run_pipeline(scale_factor: int) -> List[Dict[str, float]]:
+    """Run pipeline
+
+    Args:
+        scale_factor (int): The size of the synthetic dataset, relative to the real dataset.
+
+    Returns:
+        List[Dict[str, float]]: For each stage of the pipeline, its name and wall time.
+    """
+    num_instances = BASE_NUM_INSTANCES * scale_factor
+    dataset = synthetic.create_dataset(num_instances=num_instances, num_features=NUM_FEATURES)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = pathlib.Path(work_dir)
+        (work_dir / 'data').mkdir()
+        dataset.to_csv(work_dir / 'data' / 'dataset.csv', index=False)
+        for script in SCRIPTS:
+            results.append({'stage': script,
+                            'time_s': run_script(script=script, work_dir=work_dir)})
+    oracle = al_oracle.ALOracle()
+    start_time = time.perf_counter()
+    X_train, X_test = oracle.split_data(dataset=dataset, target=al_oracle.DEFAULT_SOLVER)
+    results.append({'stage': 'ALOracle.split_data()', 'time_s': time.perf_counter() - start_time})
+    start_time = time.perf_counter()
+    oracle.query_labels_batch(query_indices=np.arange(len(X_train)))
+    results.append({'stage': 'ALOracle.query_labels_batch()',
+                    'time_s': time.perf_counter() - start_time})
+    y_pred = np.random.default_rng(seed=25).integers(low=0, high=2, size=len(X_test))
+    start_time = time.perf_counter()
+    oracle.score(y_pred=y_pred)
+    results.append({'stage': 'ALOracle.score()', 'time_s': time.perf_counter() - start_time})
+    return [{'scale_factor': scale_factor, 'num_instances': num_instances, **x} for x in results]
+
+
+if __name__ == '__main__':
+    results = []
+    for scale_factor in SCALE_FACTORS:
+        results.extend(run_pipeline(scale_factor=scale_factor))
+    results = pd.DataFrame(results)
+    print(results.round(3).to_string(index=False), end='\n\n')
+    comparison = history.save_and_compare(results=results, benchmark='scale_up',
+                                          key_columns=['scale_factor', 'stage'])
+    print(comparison.round(3).to_string(index=False))
+    if comparison['regression'].any():
+        print(f'\nRegression: at least one stage took more than {history.REGRESSION_THRESHOLD}x the'
+              ' time of the previous run.')
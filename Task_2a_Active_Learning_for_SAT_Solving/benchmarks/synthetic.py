@@ -0,0 +1,33 @@
+"""Synthetic SAT-solving data
+
+Helper module for the benchmarks. Creates random datasets with the same columns as the dataset
+prepared by `prepare_data.py`, so benchmarks do not depend on the real data.
+"""
+
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+
+
+def create_dataset(num_instances: int, num_features: int = 2, num_solvers: int = 1,
+                   seed: int = 25) -> pd.DataFrame:
+    rng = np.random.default_rng(seed=seed)
+    features = rng.random(size=(num_instances, num_features))
+    # Runtimes are heavy-tailed (as for real SAT solvers), with about 30% timeouts, and their
+    # logarithm partly depends on the first feature (so they are somewhat predictable):
+    hardness = 0.5 * features[:, [0]] + 0.5 * rng.random(size=(num_instances, num_solvers))
+    runtimes = np.exp(hardness * np.log(al_oracle.COMPETITION_TIMEOUT) / 0.613)
+    runtimes[runtimes >= al_oracle.COMPETITION_TIMEOUT] = 2 * al_oracle.COMPETITION_TIMEOUT
+    dataset = pd.DataFrame({'hash': [f'{i:032x}' for i in range(num_instances)]})
+    columns = {}
+    for i in range(num_features):
+        prefix = 'base.' if i % 2 == 0 else 'gate.'
+        columns[f'{prefix}feature_{i}'] = features[:, i]
+    for i in range(num_solvers):
+        solver = al_oracle.DEFAULT_SOLVER if i == 0 else f'runtimes.solver_{i}'
+        columns[solver] = runtimes[:, i]
+    dataset = pd.concat([dataset, pd.DataFrame(columns)], axis='columns')
+    dataset['result'] = rng.choice(['sat', 'unsat'], size=num_instances)
+    return dataset
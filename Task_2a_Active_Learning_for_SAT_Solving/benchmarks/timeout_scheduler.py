@@ -0,0 +1,120 @@
+"""Benchmark timeout schedules
+
+Script that compares the solver time needed to label a fixed number of instances with different
+timeout schedules: querying with the SAT Competition's timeout, a ladder of increasing timeouts
+where each re-query pays the full timeout again (as with plain `ALOracle` queries), and resumable
+queries of `al_scheduler.TimeoutScheduler` (same ladder, doubling policy, runtime-prediction
+policy). Further, compares how many labels the policies obtain within a budget of solver time
+(querying the whole pool round by round) and how many query rounds they need, compared to querying
+each instance once with the SAT Competition's timeout. Uses synthetic data, so no prepared dataset
+is necessary.
+"""
+
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import al_oracle
+import al_scheduler
+from benchmarks import synthetic
+
+
+BATCH_SIZE = 20
+BUDGET = 1000000  # solver time for budget-limited labeling
+NUM_FEATURES = 20
+NUM_INSTANCES = 5000
+NUM_LABELS = 1000
+TIMEOUT_LADDER = [100, 500, 1000, al_oracle.COMPETITION_TIMEOUT]
+
+
+def label_fixed(oracle, query_indices):
+    return oracle.query_labels_batch(query_indices=query_indices)[1].sum()
+
+
+def label_ladder(oracle, query_indices):
+    total_cost = 0
+    for batch in np.split(query_indices, len(query_indices) // BATCH_SIZE):
+        for query_timeout in TIMEOUT_LADDER:  # re-query timed-out instances, paying full timeout
+            _, costs, timed_out = oracle.query_labels_batch(query_indices=batch,
+                                                            query_timeouts=query_timeout)
+            total_cost += costs.sum()
+            batch = batch[timed_out]
+    return total_cost
+
+
+def label_ladder_resumable(oracle, query_indices):
+    scheduler = al_scheduler.TimeoutScheduler(oracle=oracle)
+    for batch in np.split(query_indices, len(query_indices) // BATCH_SIZE):
+        for query_timeout in TIMEOUT_LADDER:
+            _, _, timed_out = scheduler.query(query_indices=batch, query_timeouts=query_timeout)
+            batch = batch[timed_out]
+    return scheduler.get_total_cost()
+
+
+def label_policy(oracle, query_indices, policy):
+    scheduler = al_scheduler.TimeoutScheduler(oracle=oracle)
+    for batch in np.split(query_indices, len(query_indices) // BATCH_SIZE):
+        scheduler.query_until_labeled(query_indices=batch, policy=policy)
+    return scheduler.get_total_cost()
+
+
+def count_labels_fixed(oracle, query_indices):
+    scheduler = al_scheduler.TimeoutScheduler(oracle=oracle, budget=BUDGET)
+    for batch in np.split(query_indices, len(query_indices) // BATCH_SIZE):
+        scheduler.query(query_indices=batch)
+    return scheduler.get_statistics()['num_labels'], 1
+
+
+def count_labels_policy(oracle, query_indices, policy):
+    scheduler = al_scheduler.TimeoutScheduler(oracle=oracle, budget=BUDGET)
+    num_rounds = 0
+    while (len(query_indices) > 0) and (scheduler.get_remaining_budget() > 0):
+        _, _, timed_out = scheduler.query_adaptive(query_indices=query_indices, policy=policy)
+        query_indices = query_indices[timed_out]
+        num_rounds += 1
+    return scheduler.get_statistics()['num_labels'], num_rounds
+
+
+if __name__ == '__main__':
+    dataset = synthetic.create_dataset(num_instances=NUM_INSTANCES, num_features=NUM_FEATURES)
+    oracle = al_oracle.ALOracle()
+    X_train, _ = oracle.split_data(dataset=dataset, target=al_oracle.DEFAULT_SOLVER)
+    query_indices = np.random.default_rng(seed=25).permutation(len(X_train))[:NUM_LABELS]
+    scenarios = {
+        'fixed timeout': lambda: label_fixed(oracle=oracle, query_indices=query_indices),
+        'ladder': lambda: label_ladder(oracle=oracle, query_indices=query_indices),
+        'ladder (resumable)': lambda: label_ladder_resumable(
+            oracle=oracle, query_indices=query_indices),
+        'doubling (resumable)': lambda: label_policy(
+            oracle=oracle, query_indices=query_indices, policy=al_scheduler.DoublingPolicy()),
+        'runtime prediction (resumable)': lambda: label_policy(
+            oracle=oracle, query_indices=query_indices,
+            policy=al_scheduler.RuntimePredictionPolicy(X_train=X_train))
+    }
+    results = []
+    for name, func in scenarios.items():
+        start_time = time.perf_counter()
+        total_cost = func()
+        end_time = time.perf_counter()
+        results.append({'scenario': name, 'solver_time_per_label': total_cost / NUM_LABELS,
+                        'wall_time_s': end_time - start_time})
+    print(pd.DataFrame(results).round(3).to_string(index=False), end='\n\n')
+    scenarios = {
+        'fixed timeout': lambda: count_labels_fixed(oracle=oracle, query_indices=query_indices),
+        'doubling (resumable)': lambda: count_labels_policy(
+            oracle=oracle, query_indices=query_indices, policy=al_scheduler.DoublingPolicy()),
+        'runtime prediction (resumable)': lambda: count_labels_policy(
+            oracle=oracle, query_indices=query_indices,
+            policy=al_scheduler.RuntimePredictionPolicy(X_train=X_train))
+    }
+    results = []
+    for name, func in scenarios.items():
+        start_time = time.perf_counter()
+        num_labels, num_rounds = func()
+        end_time = time.perf_counter()
+        results.append({'scenario': name, 'budget': BUDGET, 'num_labels': num_labels,
+                        'num_rounds': num_rounds, 'solver_time_per_label': BUDGET / num_labels,
+                        'wall_time_s': end_time - start_time})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
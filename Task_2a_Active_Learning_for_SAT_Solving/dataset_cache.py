@@ -0,0 +1,166 @@
+"""Binary cache for the SAT-solving dataset
+
+Helper module. Stores the dataset prepared by `prepare_data.py` in a binary, column-selectable
+format and loads (parts of) it much faster than parsing the CSV. See function `load_dataset()` for
+more information.
+
+The cache is a directory containing one `.npy` file per dtype of numeric columns (stored
+column-major, so selecting columns only reads these columns from disk), one `.npy` file per string
+column, and a schema file describing in which file and position each column is stored.
+"""
+
+
+import json
+import pathlib
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CSV_PATH = pathlib.Path('data/dataset.csv')
+SCHEMA_FILE = 'schema.json'
+
+
+def get_cache_dir(csv_path: pathlib.Path) -> pathlib.Path:
+    """Get cache directory
+
+    Args:
+        csv_path (pathlib.Path): The path of the dataset's CSV file.
+
+    Returns:
+        pathlib.Path: The path of the cache directory belonging to this CSV file (in the same
+            directory as the CSV file, named like the CSV file plus suffix "_cache").
+    """
+    csv_path = pathlib.Path(csv_path)
+    return csv_path.parent / f'{csv_path.stem}_cache'
+
+
+def get_columns(cache_dir: pathlib.Path) -> List[str]:
+    """Get column names of cached dataset
+
+    Args:
+        cache_dir (pathlib.Path): The cache directory.
+
+    Returns:
+        List[str]: The names of all columns in the cached dataset, in their original order.
+    """
+    with open(pathlib.Path(cache_dir) / SCHEMA_FILE, mode='r') as schema_file:
+        return [x['name'] for x in json.load(schema_file)['columns']]
+
+
+def save_cache(dataset: pd.DataFrame, cache_dir: pathlib.Path) -> None:
+    """Save binary cache
+
+    Store the `dataset` in the cache format. Numeric columns keep their dtype; all other columns
+    are stored as strings (so they should not contain missing values).
+
+    Args:
+        dataset (pd.DataFrame): The dataset to be cached.
+        cache_dir (pathlib.Path): The cache directory (will be created if not existing).
+
+    Returns:
+        None.
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / SCHEMA_FILE).unlink(missing_ok=True)  # cache invalid till completely written
+    schema = {'columns': []}
+    dtype_groups = {}
+    for col in dataset.columns:
+        if pd.api.types.is_numeric_dtype(dataset[col]):  # also includes bool
+            dtype = str(dataset[col].dtype)
+            dtype_groups.setdefault(dtype, []).append(col)
+            schema['columns'].append({'name': col, 'dtype': dtype, 'file': f'numeric_{dtype}.npy',
+                                      'position': len(dtype_groups[dtype]) - 1})
+        else:
+            file_name = f'string_{len(schema["columns"])}.npy'
+            np.save(cache_dir / file_name, dataset[col].to_numpy(dtype=str), allow_pickle=False)
+            schema['columns'].append({'name': col, 'dtype': 'str', 'file': file_name,
+                                      'position': None})
+    for dtype, cols in dtype_groups.items():
+        np.save(cache_dir / f'numeric_{dtype}.npy', np.asfortranarray(dataset[cols].to_numpy()),
+                allow_pickle=False)
+    with open(cache_dir / SCHEMA_FILE, mode='w') as schema_file:  # written last, marks completion
+        json.dump(schema, schema_file, indent=1)
+
+
+def load_cache(cache_dir: pathlib.Path, columns: Optional[Iterable[str]] = None,
+               mmap: bool = False, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Load binary cache
+
+    Load (selected columns and rows of) a dataset stored with `save_cache()`.
+
+    Args:
+        cache_dir (pathlib.Path): The cache directory.
+        columns (Optional[Iterable[str]], optional): The columns to load. Defaults to None (in
+            which case all columns are loaded).
+        mmap (bool, optional): If True, numeric data stays memory-mapped (read-only) where possible
+            instead of being read into memory, e.g., to share it between processes. Defaults to
+            False. Has no effect if `rows` are selected.
+        rows (Optional[np.ndarray], optional): The (integer) positions of the rows to load, in the
+            order they should be returned. Defaults to None (in which case all rows are loaded).
+
+    Returns:
+        pd.DataFrame: The dataset, with columns in their original (not the requested) order.
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    with open(cache_dir / SCHEMA_FILE, mode='r') as schema_file:
+        schema = json.load(schema_file)
+    if columns is not None:
+        columns = set(columns)
+        missing_cols = columns.difference(x['name'] for x in schema['columns'])
+        if len(missing_cols) > 0:
+            raise ValueError(f'Column(s) not in cached dataset: {sorted(missing_cols)}')
+    selected_cols = [x for x in schema['columns'] if (columns is None) or (x['name'] in columns)]
+    data = {}
+    for file_name in dict.fromkeys(x['file'] for x in selected_cols):  # unique, ordered
+        file_cols = [x for x in selected_cols if x['file'] == file_name]
+        array = np.load(cache_dir / file_name, mmap_mode='r', allow_pickle=False)
+        if file_cols[0]['dtype'] == 'str':
+            if rows is not None:
+                array = array[rows]
+            data[file_cols[0]['name']] = array.astype(object)
+        else:
+            positions = [x['position'] for x in file_cols]
+            if rows is not None:  # only reads selected rows and columns
+                array = np.array(array[np.ix_(rows, positions)], order='F')
+            elif not (mmap and positions == list(range(array.shape[1]))):
+                array = np.array(array[:, positions], order='F')  # only reads selected columns
+            for i, col in enumerate(file_cols):
+                data[col['name']] = array[:, i]
+    return pd.DataFrame(data, columns=[x['name'] for x in selected_cols], copy=False)
+
+
+def load_dataset(csv_path: pathlib.Path = DEFAULT_CSV_PATH,
+                 prefixes: Optional[Iterable[str]] = None,
+                 columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Load dataset
+
+    Load the dataset from its binary cache, (re-)building the cache from the CSV file first if it
+    does not exist or is older than the CSV file. Only load the requested columns.
+
+    Args:
+        csv_path (pathlib.Path, optional): The path of the dataset's CSV file. Defaults to
+            DEFAULT_CSV_PATH.
+        prefixes (Optional[Iterable[str]], optional): Load all columns starting with one of these
+            prefixes, e.g., ["base.", "gate."] for all instance features. Defaults to None.
+        columns (Optional[Iterable[str]], optional): Additionally load these columns, e.g.,
+            ["hash", "runtimes.Kissat_MAB_ESA"]. Defaults to None. If neither `prefixes` nor
+            `columns` are passed, load all columns.
+
+    Returns:
+        pd.DataFrame: The dataset, with columns in the same order as in the CSV file.
+    """
+    csv_path = pathlib.Path(csv_path)
+    cache_dir = get_cache_dir(csv_path=csv_path)
+    schema_path = cache_dir / SCHEMA_FILE
+    if (not schema_path.exists()) or (schema_path.stat().st_mtime < csv_path.stat().st_mtime):
+        save_cache(dataset=pd.read_csv(csv_path), cache_dir=cache_dir)
+    if (prefixes is None) and (columns is None):
+        return load_cache(cache_dir=cache_dir)
+    all_columns = get_columns(cache_dir=cache_dir)
+    prefixes = tuple(prefixes) if prefixes is not None else ()
+    columns = list(columns) if columns is not None else []
+    return load_cache(cache_dir=cache_dir,
+                      columns=[x for x in all_columns if x.startswith(prefixes)] + columns)
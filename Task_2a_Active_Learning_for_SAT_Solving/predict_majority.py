@@ -10,6 +10,7 @@ import pathlib
 import pandas as pd
 import sklearn.dummy
 
+import model_cache
 import split
 
 
@@ -18,11 +19,11 @@ DATA_DIR = pathlib.Path('data/scoring/')
 
 if __name__ == '__main__':
     for target in split.TARGETS:
-        X_test = pd.read_csv(DATA_DIR / f'{target}_X_test.csv')
-        y_train = pd.read_csv(DATA_DIR / f'{target}_y_train.csv')
+        X_test = split.load_X(target=target, part='test', data_dir=DATA_DIR)
+        y_train = split.load_y(target=target, part='train', data_dir=DATA_DIR)
 
         model = sklearn.dummy.DummyClassifier(strategy='most_frequent')
-        model.fit(X=None, y=y_train[target])
+        model = model_cache.fit_or_load(model=model, X=None, y=y_train[target])
         y_test_pred = model.predict(X=X_test)
         y_test_pred = pd.DataFrame({'hash': X_test['hash'], target: y_test_pred})
 
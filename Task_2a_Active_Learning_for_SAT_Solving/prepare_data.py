@@ -4,21 +4,38 @@ Script that prepares the dataset for the practical course by:
 
 - downloading databases with meta data and instance features (base, gate) from GBD
 - downloading runtime data from SAT-Competition website
+- filtering instances (2022 Anniversary Track, satisfiablity known, no NAs in instance features)
 - merging databases
-- filtering the dataset (2022 Anniversary Track, satisfiablity known, no NAs in instance features)
+- saving the dataset as CSV and as binary cache (for faster loading, see `dataset_cache`)
+
+To reduce memory usage, we first select the instances from the meta data and then read each of the
+other databases, only keeping the selected instances, before merging and writing the dataset in
+chunks. By default, we read the downloaded GBD databases directly with `sqlite3`. Alternatively,
+we can extract them with the GBD API into CSV files first (which is considerably slower). Peak
+memory does not depend on the size of the full GBD databases, but on the selected instances: all
+filtered databases are kept in memory for merging, and reading a database needs either one
+unfiltered chunk of its CSV file or (with `sqlite3`) the selected instances' rows of the database
+at once (as strings, before converting them to float).
 """
 
 
+import contextlib
 import pathlib
+import sqlite3
 import urllib.request
 import zipfile
+from typing import Iterable, Optional
 
 import gbd_core.api
 import pandas as pd
 
+import dataset_cache
+
 
+CHUNK_SIZE = 10000  # number of rows read/written at once
 DATA_DIR = pathlib.Path('data/')
 DATABASE_NAMES = ['base', 'gate', 'meta']  # in GBD data repo
+EXTRACTION_MODE = 'sqlite'  # how to read GBD databases; alternative: 'gbd' (API + CSV export)
 FEATURE_DATA_URL = 'https://git.scc.kit.edu/fv2117/gbd-data/-/raw/master/gbdnew/'
 RUNTIME_DATA_CATEGORICAL_COLUMNS = ['benchmark', 'claimed-result', 'verified-result']
 RUNTIME_DATA_INFILE = 'anni-seq.csv'  # in *.zip file downloaded from SAT-Competition website
@@ -26,18 +43,120 @@ RUNTIME_DATA_OUTFILE = 'runtimes.csv'  # how we will store the runtimes data
 RUNTIME_DATA_TEMPFILE = 'runtimes_temp.zip'  # will be deleted after running the script
 RUNTIME_DATA_URL = 'https://satcompetition.github.io/2022/downloads/sc2022-detailed-results.zip'
 
+
+# Select instances from 2022 Anniversary Track with known satisfiability; return hash and result
+def filter_meta(meta_chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    filtered_chunks = []
+    for chunk in meta_chunks:
+        chunk = chunk[chunk['track'].fillna('').str.contains('anni_2022')]
+        chunk = chunk[chunk['result'] != 'unknown']
+        filtered_chunks.append(chunk[['hash', 'result']])
+    return pd.concat(filtered_chunks, ignore_index=True)
+
+
+# Keep the instances with the given hashes and without NAs; prefix feature names with db name.
+# Filters chunk-wise, but returns all selected instances at once (as needed for merging).
+def filter_database(db_chunks: Iterable[pd.DataFrame], db_name: str,
+                    hashes: pd.Series) -> pd.DataFrame:
+    filtered_chunks = []
+    for chunk in db_chunks:
+        chunk = chunk[chunk['hash'].isin(hashes)]
+        chunk = chunk.drop(columns=RUNTIME_DATA_CATEGORICAL_COLUMNS, errors='ignore')
+        chunk = chunk.rename(columns=lambda x: f'{db_name}.{x}' if x != 'hash' else x)
+        numeric_cols = [x for x in chunk.columns if x != 'hash']
+        chunk[numeric_cols] = chunk[numeric_cols].transform(
+            pd.to_numeric, errors='coerce').astype(float)  # float for all chunks (same format)
+        filtered_chunks.append(chunk[chunk[numeric_cols].notna().all(axis='columns')])
+    return pd.concat(filtered_chunks, ignore_index=True)
+
+
+# Export a GBD database to CSV with the GBD API (all instances, all features)
+def export_database_with_api(db_name: str, data_dir: pathlib.Path = DATA_DIR) -> None:
+    with gbd_core.api.GBD(dbs=[str(data_dir / f'{db_name}.db')]) as api:
+        features = api.get_features()
+        features.remove('hash')  # will be added to result anyway, so avoid duplicates
+        database = pd.DataFrame(api.query(resolve=features), columns=['hash'] + features)
+        database.to_csv(data_dir / f'{db_name}.csv', index=False)
+
+
+# Read a GBD database directly with SQLite, optionally only some features and instances. Should
+# yield the same values (though all as strings) and order of instances as a GBD API query.
+def read_database_with_sqlite(db_path: pathlib.Path, features: Optional[Iterable[str]] = None,
+                              hashes: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    # Connection as context manager would only end transactions, so close it explicitly:
+    with contextlib.closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as connection:
+        tables = [table for (table,) in connection.execute(
+            "SELECT tbl_name FROM sqlite_master WHERE type = 'table'") if not table.startswith('_')]
+        # Unique features are columns in the main table "features" (or a foreign key referencing
+        # the table of a non-unique feature), non-unique features are tables with "hash", "value":
+        main_features = [column for (_, column, *_) in connection.execute(
+            'PRAGMA table_info(features)') if column != 'hash' and column not in tables]
+        table_features = [x for x in tables if x != 'features']
+        if features is not None:
+            main_features = [x for x in main_features if x in features]
+            table_features = [x for x in table_features if x in features]
+        join_sql = ''
+        if hashes is not None:  # temp tables are in a separate database, so allowed in "ro" mode
+            connection.execute('CREATE TEMP TABLE selected_hashes (hash TEXT PRIMARY KEY)')
+            connection.executemany('INSERT OR IGNORE INTO selected_hashes VALUES (?)',
+                                   ((x,) for x in hashes))
+            join_sql = 'INNER JOIN temp.selected_hashes USING (hash)'
+        column_sql = ', '.join(['hash'] + [f'"{x}"' for x in main_features])
+        database = pd.read_sql_query(
+            f"SELECT {column_sql} FROM features {join_sql} WHERE hash != 'None' ORDER BY hash",
+            con=connection)
+        for feature in table_features:  # one query per table; concatenate multiple values
+            feature_values = pd.read_sql_query(
+                f'SELECT hash, GROUP_CONCAT(DISTINCT value) AS "{feature}" FROM "{feature}" '
+                f'{join_sql} GROUP BY hash', con=connection)
+            database = database.merge(feature_values, on='hash', how='left', copy=False)
+    return database
+
+
+# Yield (chunks of) a database, either from SQLite or from CSV (runtimes data are always CSV)
+def read_database(db_name: str, mode: str, data_dir: pathlib.Path = DATA_DIR,
+                  features: Optional[Iterable[str]] = None,
+                  hashes: Optional[Iterable[str]] = None) -> Iterable[pd.DataFrame]:
+    if (mode == 'sqlite') and (data_dir / f'{db_name}.db').exists():
+        return [read_database_with_sqlite(db_path=data_dir / f'{db_name}.db', features=features,
+                                          hashes=hashes)]
+    if features is not None:
+        features = ['hash'] + list(features)
+    return pd.read_csv(data_dir / f'{db_name}.csv', usecols=features, chunksize=CHUNK_SIZE)
+
+
+# Filter and merge all databases, write the dataset to CSV (chunk-wise)
+def create_dataset(mode: str, data_dir: pathlib.Path = DATA_DIR,
+                   out_file: str = 'dataset.csv') -> None:
+    # Filter instances (first by meta data, then by NAs in the other databases):
+    dataset = filter_meta(meta_chunks=read_database(
+        db_name='meta', mode=mode, data_dir=data_dir, features=['result', 'track']))
+    databases = [filter_database(db_chunks=read_database(db_name=db_name, mode=mode,
+                                                         data_dir=data_dir, hashes=dataset['hash']),
+                                 db_name=db_name, hashes=dataset['hash']).set_index('hash')
+                 for db_name in DATABASE_NAMES + [RUNTIME_DATA_OUTFILE.replace('.csv', '')]
+                 if db_name != 'meta']
+    assert dataset['hash'].nunique() == len(dataset)
+    assert all(database.index.is_unique for database in databases)
+
+    # Merge databases (chunk-wise, only instances present in all databases) and save:
+    (data_dir / out_file).unlink(missing_ok=True)
+    for start in range(0, len(dataset), CHUNK_SIZE):
+        chunk = dataset.iloc[start:(start + CHUNK_SIZE)]
+        for database in databases:
+            chunk = chunk.join(database, on='hash', how='inner')  # keeps order of instances
+        chunk.to_csv(data_dir / out_file, index=False, mode='a', header=(start == 0))
+
+
 if __name__ == '__main__':
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Download and save instance-feature data from GBD repo with GBD API:
+    # Download instance-feature data from GBD repo (and export them with GBD API, if desired):
     for db_name in DATABASE_NAMES:
         urllib.request.urlretrieve(url=f'{FEATURE_DATA_URL}{db_name}.db',
                                    filename=DATA_DIR / f'{db_name}.db')
-        with gbd_core.api.GBD(dbs=[str(DATA_DIR / f'{db_name}.db')]) as api:
-            features = api.get_features()
-            features.remove('hash')  # will be added to result anyway, so avoid duplicates
-            database = pd.DataFrame(api.query(resolve=features), columns=['hash'] + features)
-            database.to_csv(DATA_DIR / f'{db_name}.csv', index=False)
+        if EXTRACTION_MODE == 'gbd':
+            export_database_with_api(db_name=db_name)
 
     # Download and save runtime data from SAT-Competition website:
     urllib.request.urlretrieve(url=RUNTIME_DATA_URL, filename=RUNTIME_DATA_TEMPFILE)
@@ -45,25 +164,10 @@ if __name__ == '__main__':
         zip_file.extract(member=RUNTIME_DATA_INFILE, path=DATA_DIR)  # zip also contains other files
     pathlib.Path(RUNTIME_DATA_TEMPFILE).unlink()  # delete
     pathlib.Path(DATA_DIR / RUNTIME_DATA_INFILE).rename(DATA_DIR / RUNTIME_DATA_OUTFILE)
-    DATABASE_NAMES.append(RUNTIME_DATA_OUTFILE.replace('.csv', ''))
 
-    # Merge database files:
-    dataset = pd.read_csv(DATA_DIR / 'meta.csv')
-    dataset.rename(columns=lambda x: f'meta.{x}' if x not in ('hash', 'result') else x, inplace=True)
-    numeric_cols = []
-    for db_name in DATABASE_NAMES:
-        if db_name != 'meta':
-            database = pd.read_csv(DATA_DIR / (db_name + '.csv'))
-            database.drop(columns=RUNTIME_DATA_CATEGORICAL_COLUMNS, inplace=True, errors='ignore')
-            database.rename(columns=lambda x: f'{db_name}.{x}' if x != 'hash' else x, inplace=True)
-            numeric_cols.extend([x for x in database.columns if x != 'hash'])
-            dataset = dataset.merge(database, on='hash', how='left', copy=False)
-
-    # Filter instances:
-    dataset = dataset[dataset['meta.track'].fillna('').str.contains('anni_2022')]
-    dataset = dataset[dataset['result'] != 'unknown']
-    dataset[numeric_cols] = dataset[numeric_cols].transform(pd.to_numeric, errors='coerce')
-    dataset = dataset[dataset[numeric_cols].notna().all(axis='columns')]  # no missing values
-    dataset.drop(columns=[x for x in dataset.columns if 'meta.' in x], inplace=True)
-    assert dataset['hash'].nunique() == len(dataset)
-    dataset.to_csv(DATA_DIR / 'dataset.csv', index=False)
+    # Filter, merge, and save:
+    create_dataset(mode=EXTRACTION_MODE)
+    # Types in cache should match those from parsing the CSV, so re-read it once (rather than
+    # caching the chunks directly, whose dtypes might differ between chunks):
+    dataset_cache.save_cache(dataset=pd.read_csv(DATA_DIR / 'dataset.csv'),
+                             cache_dir=dataset_cache.get_cache_dir(DATA_DIR / 'dataset.csv'))
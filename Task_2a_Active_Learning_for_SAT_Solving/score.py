@@ -1,54 +1,124 @@
 """Course-internal scoring on SAT-solving data
 
 Script that finds all submission files in some directory, checks their validity, and scores them
-against a ground truth (for both prediction targets).
+against a ground truth (for both prediction targets). Submissions are processed in parallel; the
+ground truth is loaded and indexed only once. Each submission is validated while reading it,
+stopping at the first problem. Besides the score, reports bootstrap confidence intervals and
+pairwise significance between teams.
 """
 
 
-import csv
+import concurrent.futures
+import functools
+import itertools
 import pathlib
+from typing import Dict, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
-import sklearn.metrics
 
+import scoring
 import split
 
 
+CONFIDENCE_LEVEL = 0.95
 DATA_DIR = pathlib.Path('data/scoring/')  # needs to contain submissions and ground truth solution
+N_BOOTSTRAP = 1000  # number of bootstrap samples for confidence intervals and significance
+N_JOBS = None  # number of worker processes; None means number of processors on the machine
 
+_ground_truth_indexes = None  # set once per worker process (see initializer), one entry per target
 
-def validate_submission(submission: pd.DataFrame, ground_truth: pd.DataFrame, target: str) -> str:
-    if submission.shape[0] != ground_truth.shape[0]:
-        return 'Number of predictions wrong (could also be issue with header).'
-    if submission.shape[1] != ground_truth.shape[1]:
-        return 'Number of columns wrong (index column might be saved).'
-    if list(submission) != list(ground_truth):
-        return 'At least one column name wrong (might be quoted).'
-    if submission.isna().any().any():
-        return 'At least one NA.'
-    if submission[target].dtype == 'int64':
+
+# Check the predicted labels of one block of a submission (see `scoring.read_submission()`)
+def check_labels(labels: pd.Series, classes: np.ndarray) -> Optional[str]:
+    if labels.dtype == 'int64':
         return 'Predicted class labels are integer.'
-    return 'Valid.'
+    if not labels.isin(classes).all():
+        return 'At least one invalid class label.'
+    return None
+
+
+def validate_submission(submission_file: pathlib.Path, ground_truth_ids: pd.Index,
+                        classes: np.ndarray, target: str) -> Tuple[str, Optional[np.ndarray]]:
+    return scoring.read_submission(
+        submission_file=submission_file, sorted_ids=ground_truth_ids, columns=['hash', target],
+        check_labels=functools.partial(check_labels, classes=classes))
+
+
+# MCC computed from confusion counts, no join with ground truth
+def score_submission(y_pred: np.ndarray, sorted_labels: np.ndarray) -> float:
+    return float(scoring.matthews_corrcoef(scoring.count_confusion(y_true=sorted_labels,
+                                                                   y_pred=y_pred)))
+
+
+def _init_worker(ground_truths: Dict[str, pd.DataFrame]) -> None:
+    global _ground_truth_indexes
+    _ground_truth_indexes = {}
+    for target, ground_truth in ground_truths.items():
+        sorted_ids, sorted_labels = scoring.index_ground_truth(
+            ids=ground_truth['hash'].values, labels=ground_truth[target].values)
+        _ground_truth_indexes[target] = pd.Index(sorted_ids), sorted_labels
+
+
+# Return leaderboard entry and (for valid submissions) predictions in order of indexed ground truth
+def process_submission(target: str, submission_file: pathlib.Path
+                       ) -> Tuple[Dict[str, Union[str, float]], Optional[np.ndarray]]:
+    team_name = submission_file.stem.replace(f'{target}_', '').replace('_prediction', '')
+    ground_truth_ids, sorted_labels = _ground_truth_indexes[target]
+    validity_status, y_pred = validate_submission(
+        submission_file=submission_file, ground_truth_ids=ground_truth_ids,
+        classes=np.unique(sorted_labels), target=target)
+    if y_pred is None:
+        score = float('nan')
+    else:
+        score = score_submission(y_pred=y_pred, sorted_labels=sorted_labels)
+    return {'Team': team_name, 'Score': score, 'Validity': validity_status}, y_pred
+
+
+# Add confidence intervals to the leaderboard entries; return pairwise p-values
+def add_bootstrap_results(results: Sequence[Dict[str, Union[str, float]]],
+                          y_preds: Sequence[Optional[np.ndarray]],
+                          sorted_labels: np.ndarray) -> pd.DataFrame:
+    bootstrap_idx = [i for i, y_pred in enumerate(y_preds) if y_pred is not None]
+    for result in results:
+        result['CI Lower'] = result['CI Upper'] = float('nan')
+    if len(bootstrap_idx) == 0:
+        return pd.DataFrame()
+    bootstrap_scores = scoring.bootstrap_mcc(
+        y_true=sorted_labels, y_preds=np.stack([y_preds[i] for i in bootstrap_idx]),
+        n_bootstrap=N_BOOTSTRAP)
+    lower, upper = scoring.confidence_interval(bootstrap_scores=bootstrap_scores,
+                                               confidence_level=CONFIDENCE_LEVEL)
+    for i, result_idx in enumerate(bootstrap_idx):
+        results[result_idx]['CI Lower'] = lower[i]
+        results[result_idx]['CI Upper'] = upper[i]
+    return scoring.pairwise_significance(
+        bootstrap_scores=bootstrap_scores, names=[results[i]['Team'] for i in bootstrap_idx])
 
 
 if __name__ == '__main__':
-    for target in split.TARGETS:
-        print('Target:', target)
-        results = []
-        ground_truth = pd.read_csv(DATA_DIR / f'{target}_y_test.csv')
-        submission_files = list(DATA_DIR.glob(f'{target}_*_prediction.csv'))
-        for submission_file in submission_files:
-            submission = pd.read_csv(submission_file, sep=',', quoting=csv.QUOTE_NONE, header=0,
-                                     escapechar=None, encoding='utf-8')
-            team_name = submission_file.stem.replace(f'{target}_', '').replace('_prediction', '')
-            validity_status = validate_submission(submission=submission, ground_truth=ground_truth,
-                                                  target=target)
-            if validity_status == 'Valid.':
-                submission = submission.merge(ground_truth, on='hash')
-                score = sklearn.metrics.matthews_corrcoef(
-                    y_true=submission[f'{target}_y'], y_pred=submission[f'{target}_x'])
-            else:
-                score = float('nan')
-            results.append({'Team': team_name, 'Score': score, 'Validity': validity_status})
-        results = pd.DataFrame(results).sort_values(by='Score', ascending=False)
-        print(results.round(2), end='\n\n')
+    ground_truths = {target: split.load_y(target=target, part='test', data_dir=DATA_DIR)
+                     for target in split.TARGETS}
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=N_JOBS, initializer=_init_worker, initargs=(ground_truths,)) as executor:
+        for target in split.TARGETS:
+            print('Target:', target)
+            submission_files = list(DATA_DIR.glob(f'{target}_*_prediction.csv'))
+            if len(submission_files) == 0:
+                print('No submission files found.', end='\n\n')
+                continue
+            results, y_preds = zip(*executor.map(process_submission, itertools.repeat(target),
+                                                 submission_files))
+            _, sorted_labels = scoring.index_ground_truth(
+                ids=ground_truths[target]['hash'].values,
+                labels=ground_truths[target][target].values)
+            p_values = add_bootstrap_results(results=results, y_preds=y_preds,
+                                             sorted_labels=sorted_labels)
+            results = pd.DataFrame(
+                results, columns=['Team', 'Score', 'CI Lower', 'CI Upper', 'Validity'])
+            results = results.sort_values(by='Score', ascending=False)
+            teams = [x for x in results['Team'] if x in p_values.index]  # as in leaderboard
+            with pd.option_context('display.max_columns', None, 'display.width', None):
+                print(results.round(2), end='\n\n')
+                print('P-values (paired bootstrap; H0: row team is not better than column team):')
+                print(p_values.loc[teams, teams].round(3), end='\n\n')
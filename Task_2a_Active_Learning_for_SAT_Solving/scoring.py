@@ -0,0 +1,303 @@
+"""Scoring helpers
+
+Helper module for computing the Matthews correlation coefficient (MCC) from confusion counts,
+which avoids joining/validating full DataFrames like `sklearn.metrics.matthews_corrcoef()` does.
+Also computes MCC for many prediction vectors and bootstrap samples at once, to obtain confidence
+intervals and pairwise significance (see `bootstrap_mcc()`). Reads and validates submissions in
+one pass (see `read_submission()`).
+"""
+
+
+import csv
+import io
+import pathlib
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+CHUNK_BYTES = 2 ** 17  # number of submission bytes read and validated at once (initially)
+MAX_CHUNK_ELEMENTS = 2 ** 22  # bootstrapping processes chunks of samples to bound memory usage
+
+
+def index_ground_truth(ids: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index ground truth
+
+    Sort the ground truth by instance identifier, so predictions can be matched to it by position
+    in the sorted identifiers (see `read_submission()`) rather than with a join.
+
+    Args:
+        ids (np.ndarray): The instance identifiers (unique).
+        labels (np.ndarray): The true labels, in the order of `ids`.
+
+    Returns:
+        sorted_ids (np.ndarray): The sorted identifiers.
+        sorted_labels (np.ndarray): The true labels, in the order of `sorted_ids`.
+    """
+    order = np.argsort(ids, kind='stable')
+    return np.asarray(ids)[order], np.asarray(labels)[order]
+
+
+def read_submission(submission_file: pathlib.Path, sorted_ids: pd.Index, columns: Sequence[str],
+                    check_labels: Callable[[pd.Series], Optional[str]],
+                    chunk_bytes: int = CHUNK_BYTES) -> Tuple[str, Optional[np.ndarray]]:
+    """Read and validate submission
+
+    Stream the submission file in blocks of lines and stop at the first block with a problem, so
+    invalid submissions are rejected without parsing them completely and valid ones are parsed
+    only once (no separate validation pass, no join with the ground truth). The block size doubles
+    after each block, so problems at the start of the file are found quickly, while the number of
+    blocks (and thus the overhead of validating each block) only grows logarithmically. Checks
+    the header (number and names of columns), then for each block: number of fields (also by
+    counting the separators in the raw block, as `pandas` ignores or mis-assigns surplus fields of
+    some rows), number of rows (so far), NAs (also from rows with too few fields), class labels, and
+    whether each identifier is in the ground truth and occurs only once. If a submission has
+    several problems, the first one in the file is reported (with the same status messages as the
+    former, non-streaming validation).
+
+    Args:
+        submission_file (pathlib.Path): The CSV file with the predictions.
+        sorted_ids (pd.Index): The sorted identifiers of the ground truth (see
+            `index_ground_truth()`). Should be created once, as the index builds a hash table
+            when used for the first time.
+        columns (Sequence[str]): The expected columns, i.e., identifier and label column.
+        check_labels (Callable[[pd.Series], Optional[str]]): Checks the predicted labels of one
+            block, returning a status message if they are invalid and None else.
+        chunk_bytes (int, optional): The number of bytes read for the first block (which ends with
+            the last complete line read). Defaults to CHUNK_BYTES.
+
+    Returns:
+        validity_status (str): "Valid." or a description of the (first) problem.
+        y_pred (Optional[np.ndarray]): The predicted labels, in the order of `sorted_ids`. `None`
+            if the submission is invalid.
+    """
+    read_options = {'sep': ',', 'quoting': csv.QUOTE_NONE, 'escapechar': None}
+    try:
+        header = list(pd.read_csv(submission_file, nrows=0, header=0, encoding='utf-8',
+                                  **read_options))
+    except pd.errors.EmptyDataError:
+        return 'Number of predictions wrong (could also be issue with header).', None
+    if len(header) != len(columns):
+        return 'Number of columns wrong (index column might be saved).', None
+    if header != list(columns):
+        if header[0] in sorted_ids.astype(str):  # first line is a prediction, header missing
+            return 'Number of predictions wrong (could also be issue with header).', None
+        return 'At least one column name wrong (might be quoted).', None
+    id_column, label_column = columns
+    is_predicted = np.zeros(shape=len(sorted_ids), dtype=bool)
+    num_rows = 0
+    positions, labels = [], []
+    # Each block infers column types separately, so read string identifiers as strings (else
+    # digit-only ones, e.g., hashes, might become numbers); numeric identifiers are inferred, so
+    # NAs in them yield a status rather than an exception:
+    id_dtype = {id_column: str} if sorted_ids.dtype == object else None
+    remainder = b''  # incomplete last line of a block
+    with open(submission_file, mode='rb') as file:
+        while file.readline() in (b'\n', b'\r\n'):  # skip header (and blank lines before it)
+            pass
+        while True:
+            data = file.read(chunk_bytes)
+            if len(data) == 0 and len(remainder) == 0:
+                break
+            chunk_bytes *= 2
+            block = remainder + data
+            cut = block.rfind(b'\n') + 1 if len(data) > 0 else len(block)  # at end, take all
+            block, remainder = block[:cut], block[cut:]
+            try:
+                chunk = pd.read_csv(io.BytesIO(block), header=None, names=columns,
+                                    dtype=id_dtype, encoding='utf-8', **read_options)
+            except pd.errors.ParserError:
+                return 'Number of columns wrong (index column might be saved).', None
+            if len(chunk) == 0:  # no complete line read yet or only blank lines
+                continue
+            # More separators than expected means surplus fields (a row with too few fields could
+            # hide them in the count, but yields NAs):
+            if block.count(b',') > (len(columns) - 1) * len(chunk):
+                return 'Number of columns wrong (index column might be saved).', None
+            num_rows += len(chunk)
+            if num_rows > len(sorted_ids):
+                return 'Number of predictions wrong (could also be issue with header).', None
+            if chunk.isna().any().any():
+                return 'At least one NA.', None
+            validity_status = check_labels(chunk[label_column])
+            if validity_status is not None:
+                return validity_status, None
+            chunk_positions = sorted_ids.get_indexer(chunk[id_column].values)
+            if (chunk_positions == -1).any():
+                return 'At least one ID not in ground truth.', None
+            is_predicted[chunk_positions] = True
+            if np.count_nonzero(is_predicted) != num_rows:
+                return 'At least one duplicate ID.', None
+            positions.append(chunk_positions)
+            labels.append(chunk[label_column].values)
+    if num_rows != len(sorted_ids):
+        return 'Number of predictions wrong (could also be issue with header).', None
+    labels = np.concatenate(labels)
+    y_pred = np.empty_like(labels)
+    y_pred[np.concatenate(positions)] = labels
+    return 'Valid.', y_pred
+
+
+def count_confusion(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """Count confusion
+
+    Compute the confusion matrix for arbitrary (e.g., string) labels, considering the union of
+    labels occurring in `y_true` and `y_pred` as classes (like `sklearn` does).
+
+    Args:
+        y_true (np.ndarray): The true labels.
+        y_pred (np.ndarray): The predicted labels.
+
+    Returns:
+        np.ndarray: The confusion counts with shape (n_classes, n_classes), rows representing true
+            and columns representing predicted labels.
+    """
+    _, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    n_classes = codes.max() + 1 if len(codes) > 0 else 1
+    y_true_codes, y_pred_codes = codes[:len(y_true)], codes[len(y_true):]
+    return np.bincount(n_classes * y_true_codes + y_pred_codes,
+                       minlength=n_classes ** 2).reshape(n_classes, n_classes)
+
+
+def matthews_corrcoef(confusion: np.ndarray) -> np.ndarray:
+    """Matthews correlation coefficient
+
+    Compute the MCC from confusion counts, with the same formula as
+    `sklearn.metrics.matthews_corrcoef()` (also returning 0 if undefined), but vectorized over
+    arbitrarily many confusion matrices.
+
+    Args:
+        confusion (np.ndarray): Confusion counts with shape (..., n_classes, n_classes), where the
+            second-last dimension represents the true and the last dimension the predicted labels.
+
+    Returns:
+        np.ndarray: The MCC scores, with the shape of `confusion` without the last two dimensions.
+    """
+    t_sum = confusion.sum(axis=-1, dtype=np.float64)
+    p_sum = confusion.sum(axis=-2, dtype=np.float64)
+    n_correct = np.trace(confusion, axis1=-2, axis2=-1, dtype=np.float64)
+    n_samples = p_sum.sum(axis=-1)
+    cov_ytyp = n_correct * n_samples - (t_sum * p_sum).sum(axis=-1)
+    cov_ypyp = n_samples ** 2 - (p_sum * p_sum).sum(axis=-1)
+    cov_ytyt = n_samples ** 2 - (t_sum * t_sum).sum(axis=-1)
+    denominator = cov_ytyt * cov_ypyp
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, 0.0, cov_ytyp / np.sqrt(denominator))
+
+
+def encode_labels(y_true: np.ndarray, y_preds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Encode labels
+
+    Map arbitrary (e.g., string) labels of the ground truth and several prediction vectors to
+    consecutive integers, considering the union of all occurring labels as classes.
+
+    Args:
+        y_true (np.ndarray): The true labels, with shape (n_instances,).
+        y_preds (np.ndarray): The predicted labels, with shape (n_vectors, n_instances).
+
+    Returns:
+        y_true_codes (np.ndarray): The encoded true labels.
+        y_pred_codes (np.ndarray): The encoded predicted labels.
+        n_classes (int): The number of classes.
+    """
+    y_preds = np.asarray(y_preds)
+    classes, codes = np.unique(np.concatenate([np.asarray(y_true), y_preds.ravel()]),
+                               return_inverse=True)
+    return codes[:len(y_true)], codes[len(y_true):].reshape(y_preds.shape), len(classes)
+
+
+def count_confusion_batch(y_true_codes: np.ndarray, y_pred_codes: np.ndarray, n_classes: int,
+                          sample_indices: np.ndarray) -> np.ndarray:
+    """Count confusion for several prediction vectors and samples
+
+    Compute all confusion matrices with one call of `np.bincount()`.
+
+    Args:
+        y_true_codes (np.ndarray): The encoded true labels, with shape (n_instances,).
+        y_pred_codes (np.ndarray): The encoded predicted labels, with shape
+            (n_vectors, n_instances).
+        n_classes (int): The number of classes.
+        sample_indices (np.ndarray): The instances in each sample, with shape
+            (n_samples, sample_size).
+
+    Returns:
+        np.ndarray: The confusion counts, with shape (n_vectors, n_samples, n_classes, n_classes).
+    """
+    n_vectors, n_samples = y_pred_codes.shape[0], sample_indices.shape[0]
+    cell_codes = n_classes * y_true_codes[sample_indices] + y_pred_codes[:, sample_indices]
+    matrix_offsets = (n_classes ** 2) * np.arange(n_vectors * n_samples).reshape(
+        n_vectors, n_samples, 1)
+    counts = np.bincount((cell_codes + matrix_offsets).ravel(),
+                         minlength=n_vectors * n_samples * n_classes ** 2)
+    return counts.reshape(n_vectors, n_samples, n_classes, n_classes)
+
+
+def bootstrap_mcc(y_true: np.ndarray, y_preds: np.ndarray, n_bootstrap: int = 1000,
+                  random_state: int = 25) -> np.ndarray:
+    """Bootstrap MCC
+
+    Compute the MCC of several prediction vectors on the same bootstrap samples (drawn with
+    replacement, each as large as the ground truth), which allows paired comparisons.
+
+    Args:
+        y_true (np.ndarray): The true labels, with shape (n_instances,).
+        y_preds (np.ndarray): The predicted labels, with shape (n_vectors, n_instances), each
+            vector in the same order as `y_true`.
+        n_bootstrap (int, optional): The number of bootstrap samples. Defaults to 1000.
+        random_state (int, optional): A seed to ensure reproducibility of the bootstrap samples.
+            Defaults to 25.
+
+    Returns:
+        np.ndarray: The MCC scores, with shape (n_vectors, n_bootstrap).
+    """
+    y_true_codes, y_pred_codes, n_classes = encode_labels(y_true=y_true, y_preds=y_preds)
+    n_vectors, n_instances = y_pred_codes.shape
+    rng = np.random.default_rng(seed=random_state)
+    chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(1, n_vectors * n_instances))
+    scores = []
+    for start in range(0, n_bootstrap, chunk_size):
+        sample_indices = rng.integers(low=0, high=n_instances,
+                                      size=(min(chunk_size, n_bootstrap - start), n_instances))
+        scores.append(matthews_corrcoef(count_confusion_batch(
+            y_true_codes=y_true_codes, y_pred_codes=y_pred_codes, n_classes=n_classes,
+            sample_indices=sample_indices)))
+    return np.concatenate(scores, axis=1)
+
+
+def confidence_interval(bootstrap_scores: np.ndarray,
+                        confidence_level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """Confidence interval
+
+    Compute percentile-bootstrap confidence intervals.
+
+    Args:
+        bootstrap_scores (np.ndarray): Scores with shape (n_vectors, n_bootstrap).
+        confidence_level (float, optional): The confidence level. Defaults to 0.95.
+
+    Returns:
+        lower (np.ndarray): The lower bounds, with shape (n_vectors,).
+        upper (np.ndarray): The upper bounds, with shape (n_vectors,).
+    """
+    alpha = 1 - confidence_level
+    return (np.quantile(bootstrap_scores, q=alpha / 2, axis=1),
+            np.quantile(bootstrap_scores, q=1 - alpha / 2, axis=1))
+
+
+def pairwise_significance(bootstrap_scores: np.ndarray, names: Sequence[str]) -> pd.DataFrame:
+    """Pairwise significance
+
+    Compute one-sided p-values of a paired bootstrap test for each pair of prediction vectors,
+    i.e., the fraction of bootstrap samples where the row's score is not higher than the column's.
+
+    Args:
+        bootstrap_scores (np.ndarray): Scores with shape (n_vectors, n_bootstrap), computed on the
+            same bootstrap samples for all vectors (as done by `bootstrap_mcc()`).
+        names (Sequence[str]): The names of the prediction vectors (e.g., teams).
+
+    Returns:
+        pd.DataFrame: The p-values, with `names` as index and columns (NaN on the diagonal).
+    """
+    p_values = (bootstrap_scores[:, None, :] <= bootstrap_scores[None, :, :]).mean(axis=2)
+    np.fill_diagonal(p_values, np.nan)
+    return pd.DataFrame(p_values, index=names, columns=names)
@@ -1,33 +1,182 @@
 """Split SAT-solving data for course-internal scoring
 
 Script that creates and saves a stratified train-test split of the SAT instances for both targets.
+Rather than saving the (wide) features once per target and data split, saves them once in a shared
+feature store (the binary format of `dataset_cache`) and only saves the row indices of the splits.
+Optionally creates several splits (seeds or cross-validation folds) per target. The functions
+`load_X()` and `load_y()` load only the rows of one target's training or test set.
 """
 
 
 import pathlib
+from typing import Dict, Optional, Sequence
 
+import numpy as np
 import pandas as pd
-import sklearn.model_selection
+
+import dataset_cache
 
 
 INPUT_DIR = pathlib.Path('data/')
 OUTPUT_DIR = pathlib.Path('data/scoring/')
 SEED = 25
+SEEDS = [SEED]  # one holdout split (or one split per cross-validation fold) per seed
+NUM_FOLDS = None  # None means holdout split with TEST_SIZE; otherwise, stratified cross-validation
+TEST_SIZE = 0.2
 TARGETS = ['runtimes.Kissat_MAB_ESA', 'result']
+EXPORT_CSV = False  # additionally save features and labels per target as CSVs (for default split)
+STORE_DIR_NAME = 'dataset_cache'  # shared feature store (sub-directory of data directory)
+
+
+def get_split_id(seed: int = SEED, fold: Optional[int] = None) -> str:
+    """Get split ID
+
+    Args:
+        seed (int, optional): The random seed of the split. Defaults to SEED.
+        fold (Optional[int], optional): The cross-validation fold. Defaults to None (holdout split).
+
+    Returns:
+        str: The identifier of the split, as used in the names of the index files.
+    """
+    return f'seed{seed}' if fold is None else f'seed{seed}_fold{fold}'
+
+
+DEFAULT_SPLIT_ID = get_split_id(seed=SEED, fold=(None if NUM_FOLDS is None else 0))
+
+
+def create_split_indices(labels: pd.Series, seeds: Sequence[int] = (SEED,),
+                         num_folds: Optional[int] = None,
+                         test_size: float = TEST_SIZE) -> Dict[str, Dict[str, np.ndarray]]:
+    """Create split indices
+
+    Create stratified splits of one target, only based on the labels (i.e., without slicing the
+    features). Holdout splits are the same as if `sklearn.model_selection.train_test_split()` was
+    called with the full data.
+
+    Args:
+        labels (pd.Series): The class labels of the target.
+        seeds (Sequence[int], optional): The random seeds; one split (or `num_folds` splits) per
+            seed. Defaults to (SEED,).
+        num_folds (Optional[int], optional): Number of cross-validation folds. Defaults to None
+            (holdout split with `test_size`).
+        test_size (float, optional): Fraction of instances in the test set of holdout splits.
+            Defaults to TEST_SIZE.
+
+    Returns:
+        Dict[str, Dict[str, np.ndarray]]: For each split ID, the row positions of the "train" and
+            the "test" set.
+    """
+    import sklearn.model_selection  # deferred, as only creating splits (not loading) needs it
+    positions = np.arange(len(labels), dtype=np.int32)
+    split_indices = {}
+    for seed in seeds:
+        if num_folds is None:
+            train_idx, test_idx = sklearn.model_selection.train_test_split(
+                positions, test_size=test_size, random_state=seed, stratify=labels)
+            split_indices[get_split_id(seed=seed)] = {'train': train_idx, 'test': test_idx}
+        else:
+            splitter = sklearn.model_selection.StratifiedKFold(
+                n_splits=num_folds, shuffle=True, random_state=seed)
+            for fold, (train_idx, test_idx) in enumerate(splitter.split(X=positions, y=labels)):
+                split_indices[get_split_id(seed=seed, fold=fold)] = {
+                    'train': train_idx.astype(np.int32), 'test': test_idx.astype(np.int32)}
+    return split_indices
+
+
+def get_indices_path(target: str, split_id: str = DEFAULT_SPLIT_ID,
+                     data_dir: pathlib.Path = OUTPUT_DIR) -> pathlib.Path:
+    """Get path of index file
+
+    Args:
+        target (str): The prediction target (one of TARGETS).
+        split_id (str, optional): The split (see `get_split_id()`). Defaults to DEFAULT_SPLIT_ID.
+        data_dir (pathlib.Path, optional): The directory containing the split. Defaults to
+            OUTPUT_DIR.
+
+    Returns:
+        pathlib.Path: The path of the file storing the row positions of training and test set.
+    """
+    return pathlib.Path(data_dir) / f'{target}_{split_id}_indices.npz'
+
+
+def load_indices(target: str, part: str, split_id: str = DEFAULT_SPLIT_ID,
+                 data_dir: pathlib.Path = OUTPUT_DIR) -> np.ndarray:
+    """Load split indices
+
+    Args:
+        target (str): The prediction target (one of TARGETS).
+        part (str): Either "train" or "test".
+        split_id (str, optional): The split (see `get_split_id()`). Defaults to DEFAULT_SPLIT_ID.
+        data_dir (pathlib.Path, optional): The directory containing the split. Defaults to
+            OUTPUT_DIR.
+
+    Returns:
+        np.ndarray: The row positions (in the feature store) of the instances in this part.
+    """
+    if part not in ('train', 'test'):
+        raise ValueError('"part" needs to be "train" or "test".')
+    with np.load(get_indices_path(target=target, split_id=split_id, data_dir=data_dir)) as indices:
+        return indices[part]
+
+
+def load_X(target: str, part: str, split_id: str = DEFAULT_SPLIT_ID,
+           data_dir: pathlib.Path = OUTPUT_DIR) -> pd.DataFrame:
+    """Load features of a split
+
+    Args:
+        target (str): The prediction target (one of TARGETS).
+        part (str): Either "train" or "test".
+        split_id (str, optional): The split (see `get_split_id()`). Defaults to DEFAULT_SPLIT_ID.
+        data_dir (pathlib.Path, optional): The directory containing the split. Defaults to
+            OUTPUT_DIR.
+
+    Returns:
+        pd.DataFrame: The identifier column "hash" and all features, only for the instances in
+            this part.
+    """
+    rows = load_indices(target=target, part=part, split_id=split_id, data_dir=data_dir)
+    store_dir = pathlib.Path(data_dir) / STORE_DIR_NAME
+    columns = [x for x in dataset_cache.get_columns(cache_dir=store_dir) if x not in TARGETS]
+    return dataset_cache.load_cache(cache_dir=store_dir, columns=columns, rows=rows)
+
+
+def load_y(target: str, part: str, split_id: str = DEFAULT_SPLIT_ID,
+           data_dir: pathlib.Path = OUTPUT_DIR) -> pd.DataFrame:
+    """Load labels of a split
+
+    Args:
+        target (str): The prediction target (one of TARGETS).
+        part (str): Either "train" or "test".
+        split_id (str, optional): The split (see `get_split_id()`). Defaults to DEFAULT_SPLIT_ID.
+        data_dir (pathlib.Path, optional): The directory containing the split. Defaults to
+            OUTPUT_DIR.
+
+    Returns:
+        pd.DataFrame: The identifier column "hash" and the class labels of the `target`, only for
+            the instances in this part.
+    """
+    rows = load_indices(target=target, part=part, split_id=split_id, data_dir=data_dir)
+    return dataset_cache.load_cache(cache_dir=pathlib.Path(data_dir) / STORE_DIR_NAME,
+                                    columns=['hash', target], rows=rows)
 
 
 if __name__ == '__main__':
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    dataset = pd.read_csv(INPUT_DIR / 'dataset.csv')
-    features = [x for x in dataset.columns if x.startswith('base.') or x.startswith('gate.')]
-    X = dataset[['hash'] + features]  # we keep an identifier column
+    dataset = dataset_cache.load_dataset(csv_path=INPUT_DIR / 'dataset.csv',
+                                         prefixes=['base.', 'gate.'], columns=['hash'] + TARGETS)
     for target in TARGETS:
-        y = dataset[['hash', target]].copy()
         if target != 'result':
-            y[target] = (y[target] == 10000).replace({False: 'no-timeout', True: 'timeout'})
-        X_train, X_test, y_train, y_test = sklearn.model_selection.train_test_split(
-            X, y, test_size=0.2, random_state=SEED, stratify=y[target])
-        X_train.to_csv(OUTPUT_DIR / f'{target}_X_train.csv', index=False)
-        X_test.to_csv(OUTPUT_DIR / f'{target}_X_test.csv', index=False)
-        y_train.to_csv(OUTPUT_DIR / f'{target}_y_train.csv', index=False)
-        y_test.to_csv(OUTPUT_DIR / f'{target}_y_test.csv', index=False)
+            dataset[target] = (dataset[target] == 10000).replace(
+                {False: 'no-timeout', True: 'timeout'})
+    dataset_cache.save_cache(dataset=dataset, cache_dir=OUTPUT_DIR / STORE_DIR_NAME)
+    for target in TARGETS:
+        split_indices = create_split_indices(labels=dataset[target], seeds=SEEDS,
+                                             num_folds=NUM_FOLDS, test_size=TEST_SIZE)
+        for split_id, indices in split_indices.items():
+            np.savez(get_indices_path(target=target, split_id=split_id), **indices)
+        if EXPORT_CSV:  # same files as former version of this script, which saved only CSVs
+            for part in ('train', 'test'):
+                load_X(target=target, part=part).to_csv(
+                    OUTPUT_DIR / f'{target}_X_{part}.csv', index=False)
+                load_y(target=target, part=part).to_csv(
+                    OUTPUT_DIR / f'{target}_y_{part}.csv', index=False)